@@ -1,18 +1,79 @@
-from .lifestyle_shot import lifestyle_shot_by_text, lifestyle_shot_by_image
-from .shadow import add_shadow
-from .packshot import create_packshot
-from .prompt_enhancement import enhance_prompt
-from .generative_fill import generative_fill
-from .hd_image_generation import generate_hd_image
-from .erase_foreground import erase_foreground
-
-__all__ = [
-    'lifestyle_shot_by_text',
-    'lifestyle_shot_by_image',
-    'add_shadow',
-    'create_packshot',
-    'enhance_prompt',
-    'generative_fill',
-    'generate_hd_image',
-    'erase_foreground'
-] 
\ No newline at end of file
+import importlib
+import sys
+import types
+
+# Public name -> submodule defining it. Submodules are imported on first
+# attribute access (PEP 562), so e.g. a worker that only uses create_packshot
+# does not pay for aiohttp, the job poller or the other services.
+_EXPORTS = {
+    'MemoryCache': 'cache',
+    'SQLiteCache': 'cache',
+    'BriaClient': 'client',
+    'get_client': 'client',
+    'set_client': 'client',
+    'BriaError': 'errors',
+    'TransientError': 'errors',
+    'RateLimitedError': 'errors',
+    'ModerationRejectedError': 'errors',
+    'FatalError': 'errors',
+    'CircuitOpenError': 'errors',
+    'ResultTimeoutError': 'errors',
+    'ResultCancelledError': 'errors',
+    'MetricsRegistry': 'metrics',
+    'get_metrics': 'metrics',
+    'set_metrics': 'metrics',
+    'trace': 'metrics',
+    'MemoryRateLimiter': 'ratelimit',
+    'SQLiteRateLimiter': 'ratelimit',
+    'RetryPolicy': 'retry',
+    'CircuitBreaker': 'retry',
+    'BriaResult': 'results',
+    'ImageInput': 'upload',
+    'UploadPreparer': 'upload',
+    'get_upload_preparer': 'upload',
+    'set_upload_preparer': 'upload',
+    'lifestyle_shot_by_text': 'lifestyle_shot',
+    'lifestyle_shot_by_image': 'lifestyle_shot',
+    'add_shadow': 'shadow',
+    'create_packshot': 'packshot',
+    'enhance_prompt': 'prompt_enhancement',
+    'enhance_prompts': 'prompt_enhancement',
+    'request_prompt_enhancement': 'prompt_enhancement',
+    'PromptPrefetcher': 'prompt_enhancement',
+    'set_prompt_cache': 'prompt_enhancement',
+    'generative_fill': 'generative_fill',
+    'generate_hd_image': 'hd_image_generation',
+    'erase_foreground': 'erase_foreground',
+    'mask_from_canvas': 'masks',
+    'Job': 'jobs',
+    'as_completed': 'jobs',
+    'submit': 'jobs',
+}
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+class _Package(types.ModuleType):
+    # Importing a submodule binds it as an attribute of the package. Where a
+    # function shares its module's name (generative_fill, erase_foreground),
+    # keep the attribute pointing at the function, as eager imports did.
+    def __setattr__(self, name: str, value):
+        if isinstance(value, types.ModuleType) and _EXPORTS.get(name) == name:
+            return
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
+
+__all__ = list(_EXPORTS)
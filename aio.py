@@ -0,0 +1,402 @@
+"""
+Asyncio variants of the service functions.
+
+Each coroutine builds its request with the same builder as the matching sync
+function, in a worker thread since builders read and re-encode images, and
+sends it through an AsyncBriaClient, so many calls can be in flight from a
+single thread:
+
+    from services import aio
+
+    results = await asyncio.gather(*(
+        aio.create_packshot(api_key, image) for image in images
+    ))
+"""
+from typing import Dict, Any, List, Optional, Callable, Tuple
+import asyncio
+import functools
+import json
+import threading
+import time
+import weakref
+import aiohttp
+from .cache import CacheBackend
+from .client import BaseClient, Timeout, DEFAULT_TIMEOUT
+from .errors import BriaError, FatalError, TransientError, error_for_status, service_error
+from .log import get_logger
+from .results import BriaResult
+from .streaming import JSONStreamBody
+from .erase_foreground import erase_foreground as _erase_foreground, build_erase_foreground_request
+from .generative_fill import generative_fill as _generative_fill, build_generative_fill_request
+from .hd_image_generation import generate_hd_image as _generate_hd_image, build_hd_image_request
+from .lifestyle_shot import (
+    lifestyle_shot_by_text as _lifestyle_shot_by_text,
+    lifestyle_shot_by_image as _lifestyle_shot_by_image,
+    build_lifestyle_shot_by_text_request,
+    build_lifestyle_shot_by_image_request
+)
+from .packshot import create_packshot as _create_packshot, build_packshot_request
+from .prompt_enhancement import (
+    build_prompt_enhancement_request,
+    cached_enhancement,
+    get_prompt_cache,
+    normalize_prompt,
+    store_enhancement
+)
+from .shadow import add_shadow as _add_shadow, build_shadow_request
+
+logger = get_logger(__name__)
+
+
+async def _run(blocking: bool, func: Callable, *args):
+    # SQLite-backed caches and rate limiters wait on disk and file locks; run them in a thread
+    if blocking:
+        return await asyncio.to_thread(func, *args)
+    return func(*args)
+
+
+def _client_timeout(timeout: Timeout) -> aiohttp.ClientTimeout:
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+    return aiohttp.ClientTimeout(total=timeout)
+
+
+class AsyncBriaClient(BaseClient):
+    """
+    Non-blocking HTTP client for the Bria AI API.
+
+    Requests on one event loop share an aiohttp connection pool (each loop
+    using the client gets its own), and a semaphore caps how many
+    are in flight at once so a large gather() does not open unbounded sockets.
+
+    Args:
+        base_url: API base URL (defaults to BRIA_API_BASE_URL or the production engine)
+        max_concurrency: Maximum number of requests in flight at once
+        timeout: Fallback timeout for endpoints not listed in timeouts
+        timeouts: Per-endpoint timeouts keyed by endpoint path prefix
+        cache: Optional response cache for deterministic requests
+        **kwargs: Retry and circuit breaker options (see BaseClient)
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_concurrency: int = 64,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        timeouts: Optional[Dict[str, Timeout]] = None,
+        cache: Optional[CacheBackend] = None,
+        **kwargs
+    ):
+        super().__init__(base_url=base_url, timeout=timeout, timeouts=timeouts, cache=cache, **kwargs)
+        self.max_concurrency = max_concurrency
+        # event loop -> (session, semaphore, shutdown closer) for every loop using the client
+        self._sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple]" = weakref.WeakKeyDictionary()
+
+    async def _bind_loop(self):
+        # aiohttp sessions and semaphores belong to one event loop, so every
+        # loop using the client gets its own; requests in flight on one loop
+        # never lose their session because another loop started using the client
+        loop = asyncio.get_running_loop()
+        bound = self._sessions.get(loop)
+        if bound is None or bound[0].closed:
+            session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.max_concurrency))
+            # Parked until the loop shuts down its async generators (asyncio.run()
+            # does before closing the loop), which closes the session with it
+            closer = self._close_at_shutdown(session)
+            bound = self._sessions[loop] = (session, asyncio.Semaphore(self.max_concurrency), closer)
+            await closer.__anext__()
+
+            # Loops closed without shutting down their async generators leave their session behind
+            for other, (stale, _, _) in list(self._sessions.items()):
+                if other.is_closed():
+                    del self._sessions[other]
+                    await self._close_session(stale, other)
+        return bound[0], bound[1]
+
+    @staticmethod
+    async def _close_at_shutdown(session: aiohttp.ClientSession):
+        try:
+            yield
+        finally:
+            await session.close()
+
+    @staticmethod
+    async def _close_session(session: aiohttp.ClientSession, loop: asyncio.AbstractEventLoop):
+        if session.closed:
+            return
+        if loop is asyncio.get_running_loop() or loop.is_closed():
+            # A closed loop took its sockets with it; this only releases the session and connector
+            await session.close()
+        else:
+            # Its connections belong to that loop, so close it there (once the loop runs again)
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+
+    async def post(self, endpoint: str, api_key: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST a JSON payload to an endpoint and return the decoded response.
+
+        Bytes values in the payload are file fields; they are streamed into
+        the request body as base64 strings.
+
+        Args:
+            endpoint: Endpoint path relative to the base URL
+            api_key: Bria AI API key
+            data: JSON request payload
+
+        Returns:
+            Dict containing the API response
+
+        Raises:
+            BriaError: A typed subclass once retries are exhausted or the circuit is open
+        """
+        cache_blocking = self.cache is not None and self.cache.blocking
+        key, cached = await _run(cache_blocking, self.cache_lookup, endpoint, data)
+        if cached is not None:
+            logger.debug("Cache hit for %s", endpoint, extra={"endpoint": endpoint})
+            return cached
+
+        breaker = self.breaker_for(endpoint)
+        start = time.perf_counter()
+        stats: Dict[str, Any] = {}
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire_async(api_key, endpoint, self.url(endpoint))
+                breaker.before_call(endpoint)
+                try:
+                    result = await self._send(endpoint, api_key, data, stats)
+                except BriaError as e:
+                    breaker.record_failure(e)
+                    await _run(
+                        self.rate_limiter is not None and self.rate_limiter.blocking,
+                        self.record_rate_limited, api_key, endpoint, e
+                    )
+                    delay = self.retry.delay_for(e, attempt)
+                    if delay is None:
+                        raise
+                    self.log_retry(endpoint, attempt, delay, e)
+                    # Back off outside the semaphore so waiting calls do not hold a slot
+                    await asyncio.sleep(delay)
+                    continue
+                except BaseException:
+                    # Cancelled or not an API error: says nothing about the endpoint's health
+                    breaker.release_trial()
+                    raise
+                breaker.record_success()
+                break
+        except Exception as e:
+            self.record_call(endpoint, start, attempt, stats, e)
+            raise
+        self.record_call(endpoint, start, attempt, stats)
+
+        if key is not None:
+            await _run(cache_blocking, self.cache.set, key, result)
+        return result
+
+    async def _send(self, endpoint: str, api_key: str, data: Dict[str, Any], stats: Dict[str, Any]) -> Dict[str, Any]:
+        session, semaphore = await self._bind_loop()
+        url = self.url(endpoint)
+        headers = self.headers(api_key)
+
+        async with semaphore:
+            self.log_request(endpoint, url, headers, data)
+
+            # A streamed body can only be read once, so every attempt builds its own
+            body = JSONStreamBody(data)
+            stats.clear()
+            stats["upload_bytes"] = len(body)
+            start = time.perf_counter()
+            try:
+                async with session.post(
+                    url,
+                    headers={**headers, 'Content-Length': str(len(body))},
+                    data=body,
+                    timeout=_client_timeout(self.timeout_for(endpoint))
+                ) as response:
+                    # The context is entered once the response headers have arrived
+                    stats["ttfb"] = time.perf_counter() - start
+                    stats["status"] = response.status
+                    stats["encode_time"] = body.encode_time
+                    raw = await response.read()
+                    stats["response_bytes"] = len(raw)
+                    text = raw.decode(response.get_encoding(), errors="replace")
+                    self.log_response(endpoint, response.status, time.perf_counter() - start, text)
+                    if response.status >= 400:
+                        raise error_for_status(
+                            response.status, response.reason, url, response.headers.get("Retry-After"), text
+                        )
+
+                    try:
+                        return json.loads(text)
+                    except ValueError as e:
+                        raise FatalError(f"Invalid JSON response from {url}: {str(e)}", status_code=response.status) from e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise TransientError(f"Request to {url} failed: {str(e)}") from e
+
+    async def close(self):
+        """Close the session of every event loop that used the client."""
+        bound = list(self._sessions.items())
+        self._sessions.clear()
+        for loop, (session, _, _) in bound:
+            await self._close_session(session, loop)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+_default_client: Optional[AsyncBriaClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_client() -> AsyncBriaClient:
+    """Return the shared client used by the async service functions."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = AsyncBriaClient()
+    return _default_client
+
+
+def set_client(client: Optional[AsyncBriaClient]) -> None:
+    """Replace the shared async client, e.g. to change the concurrency limit."""
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
+
+
+def _async_variant(
+    sync_func: Callable,
+    builder: Callable[..., Tuple[str, Dict[str, Any]]],
+    error_message: str
+):
+    """Create a coroutine taking the same arguments as sync_func."""
+    async def call(api_key: str, *args, client: Optional[AsyncBriaClient] = None, **kwargs) -> BriaResult:
+        # Builders read files and re-encode images, so keep them off the event loop
+        endpoint, data = await asyncio.to_thread(builder, *args, **kwargs)
+        try:
+            return BriaResult(await (client or get_client()).post(endpoint, api_key, data))
+        except Exception as e:
+            raise service_error(error_message, e)
+
+    call.__name__ = sync_func.__name__
+    call.__qualname__ = sync_func.__qualname__
+    call.__doc__ = sync_func.__doc__
+    return call
+
+
+create_packshot = _async_variant(_create_packshot, build_packshot_request, "Packshot creation failed")
+add_shadow = _async_variant(_add_shadow, build_shadow_request, "Shadow addition failed")
+lifestyle_shot_by_text = _async_variant(
+    _lifestyle_shot_by_text, build_lifestyle_shot_by_text_request, "Lifestyle shot generation failed"
+)
+lifestyle_shot_by_image = _async_variant(
+    _lifestyle_shot_by_image, build_lifestyle_shot_by_image_request, "Lifestyle shot generation failed"
+)
+generative_fill = _async_variant(_generative_fill, build_generative_fill_request, "Generative fill failed")
+erase_foreground = _async_variant(_erase_foreground, build_erase_foreground_request, "Erase foreground failed")
+
+
+async def generate_hd_image(
+    prompt: str,
+    api_key: str,
+    *args,
+    client: Optional[AsyncBriaClient] = None,
+    **kwargs
+) -> BriaResult:
+    endpoint, data = await asyncio.to_thread(build_hd_image_request, prompt, *args, **kwargs)
+    try:
+        return BriaResult(await (client or get_client()).post(endpoint, api_key, data))
+    except Exception as e:
+        raise service_error("HD image generation failed", e)
+
+generate_hd_image.__doc__ = _generate_hd_image.__doc__
+
+
+async def enhance_prompt(
+    api_key: str,
+    prompt: str,
+    client: Optional[AsyncBriaClient] = None,
+    **kwargs
+) -> str:
+    """
+    Enhance a prompt using Bria AI's prompt enhancement service.
+
+    Shares the normalized-prompt cache with the sync enhance_prompt.
+
+    Args:
+        api_key: Bria AI API key
+        prompt: Original prompt to enhance
+        client: Optional AsyncBriaClient to send the request with (defaults to the shared client)
+        **kwargs: Additional parameters for the API
+
+    Returns:
+        Enhanced prompt string
+    """
+    cache = get_prompt_cache()
+    cache_blocking = cache is not None and cache.blocking
+    key, cached = await _run(cache_blocking, functools.partial(cached_enhancement, prompt, **kwargs))
+    if cached is not None:
+        return cached
+
+    endpoint, data = build_prompt_enhancement_request(prompt, **kwargs)
+
+    try:
+        result = await (client or get_client()).post(endpoint, api_key, data)
+    except Exception as e:
+        logger.warning("Error enhancing prompt: %s", str(e))
+        return prompt  # Return original prompt on error
+
+    await _run(cache_blocking, store_enhancement, key, result)
+    return result.get("prompt variations", prompt)  # Return original prompt if enhancement fails
+
+
+async def enhance_prompts(
+    api_key: str,
+    prompts: List[str],
+    client: Optional[AsyncBriaClient] = None,
+    **kwargs
+) -> List[str]:
+    """
+    Enhance a list of prompts concurrently, calling the API once per distinct normalized prompt.
+
+    Args:
+        api_key: Bria AI API key
+        prompts: Prompts to enhance
+        client: Optional AsyncBriaClient to send the requests with (its max_concurrency caps requests in flight)
+        **kwargs: Additional parameters for the API
+
+    Returns:
+        Enhanced prompts in the same order as prompts
+    """
+    unique: Dict[str, str] = {}
+    for prompt in prompts:
+        unique.setdefault(normalize_prompt(prompt), prompt)
+
+    results = await asyncio.gather(*(
+        enhance_prompt(api_key, prompt, client=client, **kwargs) for prompt in unique.values()
+    ))
+    enhanced = dict(zip(unique, results))
+    return [enhanced[normalize_prompt(prompt)] for prompt in prompts]
+
+
+__all__ = [
+    'AsyncBriaClient',
+    'get_client',
+    'set_client',
+    'lifestyle_shot_by_text',
+    'lifestyle_shot_by_image',
+    'add_shadow',
+    'create_packshot',
+    'enhance_prompt',
+    'enhance_prompts',
+    'generative_fill',
+    'generate_hd_image',
+    'erase_foreground'
+]
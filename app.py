@@ -9,17 +9,21 @@ from services import (
     enhance_prompt,
     generative_fill,
     generate_hd_image,
-    erase_foreground
+    erase_foreground,
+    BriaClient,
+    MemoryCache,
+    SQLiteCache,
+    set_client,
+    set_prompt_cache
 )
-from PIL import Image
-import io
 import requests
 import json
-import time
+import queue
 import base64
-from streamlit_drawable_canvas import st_canvas
-import numpy as np
 from services.erase_foreground import erase_foreground
+from services.image_store import ImageStore
+from services.log import configure_logging, get_logger
+from services.prompt_enhancement import PromptPrefetcher
 
 # Configure Streamlit page
 st.set_page_config(
@@ -29,16 +33,54 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Load environment variables
-print("Loading environment variables...")
-load_dotenv(verbose=True)  # Add verbose=True to see loading details
+# Log to stderr at BRIA_LOG_LEVEL (WARNING by default)
+configure_logging()
+logger = get_logger("app")
 
-# Debug: Print environment variable status
-api_key = os.getenv("BRIA_API_KEY")
-print(f"API Key present: {bool(api_key)}")
-print(f"API Key value: {api_key if api_key else 'Not found'}")
-print(f"Current working directory: {os.getcwd()}")
-print(f".env file exists: {os.path.exists('.env')}")
+@st.cache_resource
+def load_environment():
+    """Load .env once per server process instead of on every rerun."""
+    logger.info("Loading environment variables...")
+    load_dotenv(verbose=True)  # Add verbose=True to see loading details
+
+    # Environment variable status; the key itself is never logged
+    logger.info("API key present: %s", bool(os.getenv("BRIA_API_KEY")))
+    logger.debug("Current working directory: %s", os.getcwd())
+    logger.debug(".env file exists: %s", os.path.exists('.env'))
+    return True
+
+load_environment()
+
+@st.cache_resource
+def get_service_client():
+    """Create one API client per server process so reruns reuse its connections and cache."""
+    return BriaClient(cache=MemoryCache(ttl=3600, max_entries=256))
+
+set_client(get_service_client())
+
+@st.cache_resource
+def get_prompt_cache():
+    """Keep enhanced prompts on disk so resubmitted prompts skip the API across restarts."""
+    return SQLiteCache(".prompt_cache.sqlite", ttl=30 * 86400, max_entries=10000)
+
+set_prompt_cache(get_prompt_cache())
+
+@st.cache_resource
+def get_image_store():
+    """Keep downloaded result images across reruns so each one is fetched once."""
+    return ImageStore(max_bytes=256 * 1024 * 1024)
+
+def get_prompt_prefetcher():
+    """Return this session's background prompt enhancer, recreated if the API key changes."""
+    api_key = st.session_state.get('api_key')
+    if not api_key:
+        return None
+    prefetcher = st.session_state.get('prompt_prefetcher')
+    if prefetcher is None or prefetcher.api_key != api_key:
+        if prefetcher is not None:
+            prefetcher.close()
+        prefetcher = st.session_state.prompt_prefetcher = PromptPrefetcher(api_key, delay=0.6)
+    return prefetcher
 
 def initialize_session_state():
     """Initialize session state variables."""
@@ -50,6 +92,9 @@ def initialize_session_state():
         st.session_state.current_image = None
     if 'pending_urls' not in st.session_state:
         st.session_state.pending_urls = []
+    if 'poll_events' not in st.session_state:
+        st.session_state.poll_events = queue.Queue()  # Filled by the shared poller's callbacks
+        st.session_state.watched_urls = set()
     if 'edited_image' not in st.session_state:
         st.session_state.edited_image = None
     if 'original_prompt' not in st.session_state:
@@ -60,60 +105,49 @@ def initialize_session_state():
 def download_image(url):
     """Download image from URL and return as bytes."""
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.content
+        return get_image_store().fetch(url)
     except Exception as e:
         st.error(f"Error downloading image: {str(e)}")
         return None
 
 def apply_image_filter(image, filter_type):
-    """Apply various filters to the image."""
+    """Apply a filter, or a list of filters in order, to the image."""
+    from services.filters import apply_filter, apply_filters  # Loads PIL, so only once a filter is used
     try:
-        img = Image.open(io.BytesIO(image)) if isinstance(image, bytes) else Image.open(image)
-        
-        if filter_type == "Grayscale":
-            return img.convert('L')
-        elif filter_type == "Sepia":
-            width, height = img.size
-            pixels = img.load()
-            for x in range(width):
-                for y in range(height):
-                    r, g, b = img.getpixel((x, y))[:3]
-                    tr = int(0.393 * r + 0.769 * g + 0.189 * b)
-                    tg = int(0.349 * r + 0.686 * g + 0.168 * b)
-                    tb = int(0.272 * r + 0.534 * g + 0.131 * b)
-                    img.putpixel((x, y), (min(tr, 255), min(tg, 255), min(tb, 255)))
-            return img
-        elif filter_type == "High Contrast":
-            return img.point(lambda x: x * 1.5)
-        elif filter_type == "Blur":
-            return img.filter(Image.BLUR)
-        else:
-            return img
+        if isinstance(filter_type, (list, tuple)):
+            return apply_filters(image, filter_type)
+        return apply_filter(image, filter_type)
     except Exception as e:
         st.error(f"Error applying filter: {str(e)}")
         return None
 
-def check_generated_images():
+@st.cache_resource
+def get_result_poller():
+    """Create one background poller per server process; sessions receive their events through callbacks."""
+    from services.polling import ResultPoller  # aiohttp is only needed once a generation is pending
+    return ResultPoller(initial_delay=1.0, max_delay=8.0, deadline=300.0, queue_events=False)
+
+def check_generated_images(wait=0):
     """Check if pending images are ready and update the display."""
     if st.session_state.pending_urls:
-        ready_images = []
-        still_pending = []
+        pending = st.session_state.pending_urls
+        poller = get_result_poller()
+        from services.polling import READY, drain_events
         
-        for url in st.session_state.pending_urls:
-            try:
-                response = requests.head(url)
-                # Consider an image ready if we get a 200 response with any content length
-                if response.status_code == 200:
-                    ready_images.append(url)
-                else:
-                    still_pending.append(url)
-            except Exception as e:
-                still_pending.append(url)
+        # All pending URLs are polled concurrently in the background and each
+        # finished one lands on this session's queue; here we only collect
+        # them, waiting up to `wait` seconds
+        for url in pending:
+            if url not in st.session_state.watched_urls:
+                st.session_state.watched_urls.add(url)
+                poller.watch(url, callback=st.session_state.poll_events.put)
+        finished = drain_events(st.session_state.poll_events, timeout=wait)
+        ready_images = [event.url for event in finished if event.status == READY and event.url in pending]
+        finished_urls = {event.url for event in finished}
+        st.session_state.watched_urls -= finished_urls
         
         # Update the pending URLs list
-        st.session_state.pending_urls = still_pending
+        st.session_state.pending_urls = [url for url in pending if url not in finished_urls]
         
         # If we found any ready images, update the display
         if ready_images:
@@ -124,16 +158,11 @@ def check_generated_images():
             
     return False
 
-def auto_check_images(status_container):
-    """Automatically check for image completion a few times."""
-    max_attempts = 3
-    attempt = 0
-    while attempt < max_attempts and st.session_state.pending_urls:
-        time.sleep(2)  # Wait 2 seconds between checks
-        if check_generated_images():
-            status_container.success("✨ Image ready!")
-            return True
-        attempt += 1
+def auto_check_images(status_container, timeout=6):
+    """Wait briefly for pending images, returning as soon as one is ready."""
+    if st.session_state.pending_urls and check_generated_images(wait=timeout):
+        status_container.success("✨ Image ready!")
+        return True
     return False
 
 def main():
@@ -174,6 +203,12 @@ def main():
                 st.session_state.original_prompt = prompt
                 st.session_state.enhanced_prompt = None  # Reset enhanced prompt when original changes
             
+            # Start enhancing the prompt in the background once it settles,
+            # so the result is usually ready when the button is clicked
+            prefetcher = get_prompt_prefetcher()
+            if prefetcher and prompt:
+                prefetcher.submit(prompt)
+            
             # Enhanced prompt display
             if st.session_state.get('enhanced_prompt'):
                 st.markdown("**Enhanced Prompt:**")
@@ -186,11 +221,14 @@ def main():
                 else:
                     with st.spinner("Enhancing prompt..."):
                         try:
-                            result = enhance_prompt(st.session_state.api_key, prompt)
+                            if prefetcher:
+                                result = prefetcher.enhance(prompt, timeout=30)
+                            else:
+                                result = enhance_prompt(st.session_state.api_key, prompt)
                             if result:
                                 st.session_state.enhanced_prompt = result
                                 st.success("Prompt enhanced!")
-                                st.experimental_rerun()  # Rerun to update the display
+                                st.rerun()  # Rerun to update the display
                         except Exception as e:
                             st.error(f"Error enhancing prompt: {str(e)}")
                             
@@ -241,23 +279,9 @@ def main():
                         # Debug logging
                         st.write("Debug - Raw API Response:", result)
                         
-                        if isinstance(result, dict):
-                            if "result_url" in result:
-                                st.session_state.edited_image = result["result_url"]
-                                st.success("✨ Image generated successfully!")
-                            elif "result_urls" in result:
-                                st.session_state.edited_image = result["result_urls"][0]
-                                st.success("✨ Image generated successfully!")
-                            elif "result" in result and isinstance(result["result"], list):
-                                for item in result["result"]:
-                                    if isinstance(item, dict) and "urls" in item:
-                                        st.session_state.edited_image = item["urls"][0]
-                                        st.success("✨ Image generated successfully!")
-                                        break
-                                    elif isinstance(item, list) and len(item) > 0:
-                                        st.session_state.edited_image = item[0]
-                                        st.success("✨ Image generated successfully!")
-                                        break
+                        if result.url:
+                            st.session_state.edited_image = result.url
+                            st.success("✨ Image generated successfully!")
                         else:
                             st.error("No valid result format found in the API response.")
                             
@@ -327,9 +351,9 @@ def main():
                                     content_moderation=content_moderation
                                 )
                                 
-                                if result and "result_url" in result:
+                                if result.url:
                                     st.success("✨ Packshot created successfully!")
-                                    st.session_state.edited_image = result["result_url"]
+                                    st.session_state.edited_image = result.url
                                 else:
                                     st.error("No result URL in the API response. Please try again.")
                             except Exception as e:
@@ -383,9 +407,9 @@ def main():
                                     content_moderation=content_moderation
                                 )
                                 
-                                if result and "result_url" in result:
+                                if result.url:
                                     st.success("✨ Shadow added successfully!")
-                                    st.session_state.edited_image = result["result_url"]
+                                    st.session_state.edited_image = result.url
                                 else:
                                     st.error("No result URL in the API response. Please try again.")
                             except Exception as e:
@@ -491,44 +515,11 @@ def main():
                                         st.write("Debug - Raw API Response:", result)
                                         
                                         if sync_mode:
-                                            if isinstance(result, dict):
-                                                if "result_url" in result:
-                                                    st.session_state.edited_image = result["result_url"]
-                                                    st.success("✨ Image generated successfully!")
-                                                elif "result_urls" in result:
-                                                    st.session_state.edited_image = result["result_urls"][0]
-                                                    st.success("✨ Image generated successfully!")
-                                                elif "result" in result and isinstance(result["result"], list):
-                                                    for item in result["result"]:
-                                                        if isinstance(item, dict) and "urls" in item:
-                                                            st.session_state.edited_image = item["urls"][0]
-                                                            st.success("✨ Image generated successfully!")
-                                                            break
-                                                        elif isinstance(item, list) and len(item) > 0:
-                                                            st.session_state.edited_image = item[0]
-                                                            st.success("✨ Image generated successfully!")
-                                                            break
-                                                elif "urls" in result:
-                                                    st.session_state.edited_image = result["urls"][0]
-                                                    st.success("✨ Image generated successfully!")
+                                            if result.url:
+                                                st.session_state.edited_image = result.url
+                                                st.success("✨ Image generated successfully!")
                                         else:
-                                            urls = []
-                                            if isinstance(result, dict):
-                                                if "urls" in result:
-                                                    urls.extend(result["urls"][:num_results])  # Limit to requested number
-                                                elif "result" in result and isinstance(result["result"], list):
-                                                    # Process each result item
-                                                    for item in result["result"]:
-                                                        if isinstance(item, dict) and "urls" in item:
-                                                            urls.extend(item["urls"])
-                                                        elif isinstance(item, list):
-                                                            urls.extend(item)
-                                                        # Break if we have enough URLs
-                                                        if len(urls) >= num_results:
-                                                            break
-                                                    
-                                                    # Trim to requested number
-                                                    urls = urls[:num_results]
+                                            urls = result.urls[:num_results]  # Limit to requested number
                                             
                                             if urls:
                                                 st.session_state.pending_urls = urls
@@ -592,44 +583,11 @@ def main():
                                         st.write("Debug - Raw API Response:", result)
                                         
                                         if sync_mode:
-                                            if isinstance(result, dict):
-                                                if "result_url" in result:
-                                                    st.session_state.edited_image = result["result_url"]
-                                                    st.success("✨ Image generated successfully!")
-                                                elif "result_urls" in result:
-                                                    st.session_state.edited_image = result["result_urls"][0]
-                                                    st.success("✨ Image generated successfully!")
-                                                elif "result" in result and isinstance(result["result"], list):
-                                                    for item in result["result"]:
-                                                        if isinstance(item, dict) and "urls" in item:
-                                                            st.session_state.edited_image = item["urls"][0]
-                                                            st.success("✨ Image generated successfully!")
-                                                            break
-                                                        elif isinstance(item, list) and len(item) > 0:
-                                                            st.session_state.edited_image = item[0]
-                                                            st.success("✨ Image generated successfully!")
-                                                            break
-                                                elif "urls" in result:
-                                                    st.session_state.edited_image = result["urls"][0]
-                                                    st.success("✨ Image generated successfully!")
+                                            if result.url:
+                                                st.session_state.edited_image = result.url
+                                                st.success("✨ Image generated successfully!")
                                         else:
-                                            urls = []
-                                            if isinstance(result, dict):
-                                                if "urls" in result:
-                                                    urls.extend(result["urls"][:num_results])  # Limit to requested number
-                                                elif "result" in result and isinstance(result["result"], list):
-                                                    # Process each result item
-                                                    for item in result["result"]:
-                                                        if isinstance(item, dict) and "urls" in item:
-                                                            urls.extend(item["urls"])
-                                                        elif isinstance(item, list):
-                                                            urls.extend(item)
-                                                        # Break if we have enough URLs
-                                                        if len(urls) >= num_results:
-                                                            break
-                                                    
-                                                    # Trim to requested number
-                                                    urls = urls[:num_results]
+                                            urls = result.urls[:num_results]  # Limit to requested number
                                             
                                             if urls:
                                                 st.session_state.pending_urls = urls
@@ -679,6 +637,12 @@ def main():
         
         uploaded_file = st.file_uploader("Upload Image", type=["png", "jpg", "jpeg"], key="fill_upload")
         if uploaded_file:
+            # The canvas stack is only loaded once an image is being edited
+            from PIL import Image, ImageOps
+            import numpy as np
+            from streamlit_drawable_canvas import st_canvas
+            from services.masks import mask_from_canvas
+            
             # Create columns for original image and canvas
             col1, col2 = st.columns(2)
             
@@ -686,8 +650,8 @@ def main():
                 # Display original image
                 st.image(uploaded_file, caption="Original Image", use_column_width=True)
                 
-                # Get image dimensions for canvas
-                img = Image.open(uploaded_file)
+                # Get image dimensions for canvas, upright as the API will see it
+                img = ImageOps.exif_transpose(Image.open(uploaded_file))
                 img_width, img_height = img.size
                 
                 # Calculate aspect ratio and set canvas height
@@ -741,6 +705,14 @@ def main():
                     content_moderation = st.checkbox("Enable Content Moderation", False,
                         key="gen_fill_content_mod")
                 
+                col_c, col_d = st.columns(2)
+                with col_c:
+                    mask_grow = st.slider("Grow mask (px)", 0, 30, 0,
+                        help="Expand the painted area so the fill blends past its edges")
+                with col_d:
+                    mask_feather = st.slider("Smooth mask edges (px)", 0, 10, 2,
+                        help="Round off brush edges before the mask is scaled to full resolution")
+                
                 if st.button("🎨 Generate", type="primary"):
                     if not prompt:
                         st.error("Please enter a prompt describing what to generate.")
@@ -750,14 +722,17 @@ def main():
                         st.error("Please draw a mask on the image first.")
                         return
                     
-                    # Convert canvas result to mask
-                    mask_img = Image.fromarray(canvas_result.image_data.astype('uint8'), mode='RGBA')
-                    mask_img = mask_img.convert('L')
-                    
-                    # Convert mask to bytes
-                    mask_bytes = io.BytesIO()
-                    mask_img.save(mask_bytes, format='PNG')
-                    mask_bytes = mask_bytes.getvalue()
+                    # Binarize the strokes and scale them to the full-resolution image as a 1-bit PNG
+                    mask = mask_from_canvas(
+                        canvas_result.image_data,
+                        size=(img_width, img_height),
+                        grow=mask_grow,
+                        feather_radius=mask_feather
+                    )
+                    if mask.bbox is None:
+                        st.error("Please draw a mask on the image first.")
+                        return
+                    mask_bytes = mask.data
                     
                     # Convert uploaded image to bytes
                     image_bytes = uploaded_file.getvalue()
@@ -780,17 +755,14 @@ def main():
                                 st.write("Debug - API Response:", result)
                                 
                                 if sync_mode:
-                                    if "urls" in result and result["urls"]:
-                                        st.session_state.edited_image = result["urls"][0]
-                                        if len(result["urls"]) > 1:
-                                            st.session_state.generated_images = result["urls"]
-                                        st.success("✨ Generation complete!")
-                                    elif "result_url" in result:
-                                        st.session_state.edited_image = result["result_url"]
+                                    if result.url:
+                                        st.session_state.edited_image = result.url
+                                        if len(result.urls) > 1:
+                                            st.session_state.generated_images = result.urls
                                         st.success("✨ Generation complete!")
                                 else:
-                                    if "urls" in result:
-                                        st.session_state.pending_urls = result["urls"][:num_results]
+                                    if result.urls:
+                                        st.session_state.pending_urls = result.urls[:num_results]
                                         
                                         # Create containers for status
                                         status_container = st.empty()
@@ -835,6 +807,9 @@ def main():
         
         uploaded_file = st.file_uploader("Upload Image", type=["png", "jpg", "jpeg"], key="erase_upload")
         if uploaded_file:
+            from PIL import Image
+            from streamlit_drawable_canvas import st_canvas
+            
             col1, col2 = st.columns(2)
             
             with col1:
@@ -896,8 +871,8 @@ def main():
                                 )
                                 
                                 if result:
-                                    if "result_url" in result:
-                                        st.session_state.edited_image = result["result_url"]
+                                    if result.url:
+                                        st.session_state.edited_image = result.url
                                         st.success("✨ Area erased successfully!")
                                     else:
                                         st.error("No result URL in the API response. Please try again.")
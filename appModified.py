@@ -15,11 +15,16 @@ from PIL import Image
 import io
 import requests
 import json
+import queue
 import time
 import base64
 from streamlit_drawable_canvas import st_canvas
 import numpy as np
 from services.erase_foreground import erase_foreground
+from services.image_store import ImageStore
+from services.polling import ResultPoller, READY, drain_events
+from services.filters import apply_filter, apply_filters
+from services.log import configure_logging, get_logger
 
 # Configure Streamlit page
 st.set_page_config(
@@ -29,13 +34,17 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Log to stderr at BRIA_LOG_LEVEL (WARNING by default)
+configure_logging()
+logger = get_logger("app")
+
 # Load environment variables
-print("Loading environment variables...")
+logger.info("Loading environment variables...")
 load_dotenv(verbose=True)
 
-# Debug: Print environment variable status (keep for development)
+# Environment variable status (set BRIA_LOG_LEVEL=INFO to see it)
 api_key = os.getenv("BRIA_API_KEY")
-print(f"API Key present: {bool(api_key)}")
+logger.info("API key present: %s", bool(api_key))
 
 def initialize_session_state():
     """Initialize session state variables."""
@@ -47,6 +56,9 @@ def initialize_session_state():
         st.session_state.current_image = None
     if 'pending_urls' not in st.session_state:
         st.session_state.pending_urls = []
+    if 'poll_events' not in st.session_state:
+        st.session_state.poll_events = queue.Queue()  # Filled by the shared poller's callbacks
+        st.session_state.watched_urls = set()
     if 'edited_image' not in st.session_state:
         st.session_state.edited_image = None
     if 'original_prompt' not in st.session_state:
@@ -54,12 +66,15 @@ def initialize_session_state():
     if 'enhanced_prompt' not in st.session_state:
         st.session_state.enhanced_prompt = None
 
+@st.cache_resource
+def get_image_store():
+    """Keep downloaded result images across reruns so each one is fetched once."""
+    return ImageStore(max_bytes=256 * 1024 * 1024, timeout=30)
+
 def download_image_bytes(url):
     """Download image from URL and return as bytes for auto-download."""
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        return response.content
+        return get_image_store().fetch(url)
     except Exception as e:
         st.error(f"Error downloading image: {str(e)}")
         return None
@@ -106,69 +121,55 @@ def auto_download_image(url, filename="pixify_generated.png"):
         return False
 
 def apply_image_filter(image, filter_type):
-    """Apply various filters to the image."""
+    """Apply a filter, or a list of filters in order, to the image."""
     try:
-        img = Image.open(io.BytesIO(image)) if isinstance(image, bytes) else Image.open(image)
-        
-        if filter_type == "Grayscale":
-            return img.convert('L')
-        elif filter_type == "Sepia":
-            width, height = img.size
-            pixels = img.load()
-            for x in range(width):
-                for y in range(height):
-                    r, g, b = img.getpixel((x, y))[:3]
-                    tr = int(0.393 * r + 0.769 * g + 0.189 * b)
-                    tg = int(0.349 * r + 0.686 * g + 0.168 * b)
-                    tb = int(0.272 * r + 0.534 * g + 0.131 * b)
-                    img.putpixel((x, y), (min(tr, 255), min(tg, 255), min(tb, 255)))
-            return img
-        elif filter_type == "High Contrast":
-            return img.point(lambda x: x * 1.5)
-        elif filter_type == "Blur":
-            return img.filter(Image.BLUR)
-        else:
-            return img
+        if isinstance(filter_type, (list, tuple)):
+            return apply_filters(image, filter_type)
+        return apply_filter(image, filter_type)
     except Exception as e:
         st.error(f"Error applying filter: {str(e)}")
         return None
 
-def check_generated_images():
+@st.cache_resource
+def get_result_poller():
+    """Create one background poller per server process; sessions receive their events through callbacks."""
+    return ResultPoller(initial_delay=1.0, max_delay=8.0, deadline=300.0, queue_events=False)
+
+def check_generated_images(wait=0):
     """Check if pending images are ready and update the display."""
     if st.session_state.pending_urls:
-        ready_images = []
-        still_pending = []
+        pending = st.session_state.pending_urls
+        poller = get_result_poller()
         
-        for url in st.session_state.pending_urls:
-            try:
-                response = requests.head(url, timeout=10)
-                if response.status_code == 200:
-                    ready_images.append(url)
-                else:
-                    still_pending.append(url)
-            except Exception as e:
-                still_pending.append(url)
+        # All pending URLs are polled concurrently in the background and each
+        # finished one lands on this session's queue; here we only collect
+        # them, waiting up to `wait` seconds
+        for url in pending:
+            if url not in st.session_state.watched_urls:
+                st.session_state.watched_urls.add(url)
+                poller.watch(url, callback=st.session_state.poll_events.put)
+        finished = drain_events(st.session_state.poll_events, timeout=wait)
+        ready_images = [event.url for event in finished if event.status == READY and event.url in pending]
+        finished_urls = {event.url for event in finished}
+        st.session_state.watched_urls -= finished_urls
         
-        st.session_state.pending_urls = still_pending
+        # Update the pending URLs list
+        st.session_state.pending_urls = [url for url in pending if url not in finished_urls]
         
+        # If we found any ready images, update the display
         if ready_images:
-            st.session_state.edited_image = ready_images[0]
+            st.session_state.edited_image = ready_images[0]  # Display the first ready image
             if len(ready_images) > 1:
-                st.session_state.generated_images = ready_images
+                st.session_state.generated_images = ready_images  # Store all ready images
             return True
             
     return False
 
-def auto_check_images(status_container):
-    """Automatically check for image completion."""
-    max_attempts = 3
-    attempt = 0
-    while attempt < max_attempts and st.session_state.pending_urls:
-        time.sleep(2)
-        if check_generated_images():
-            status_container.success("✨ Image ready!")
-            return True
-        attempt += 1
+def auto_check_images(status_container, timeout=6):
+    """Wait briefly for pending images, returning as soon as one is ready."""
+    if st.session_state.pending_urls and check_generated_images(wait=timeout):
+        status_container.success("✨ Image ready!")
+        return True
     return False
 
 def main():
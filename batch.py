@@ -0,0 +1,142 @@
+from typing import Dict, Any, Optional, Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import contextvars
+import csv
+import hashlib
+import json
+import os
+import re
+import time
+from .generate_ad_set import generate_ad_set
+from .upload import is_url
+
+def read_manifest(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read catalog items from a CSV or JSONL manifest.
+
+    Each item needs an 'image_path', which may also be an http(s) URL (or a
+    'prompt' for text-to-image items) and should have a 'sku'. Items without a SKU are numbered by their position.
+
+    Args:
+        path: Path to a .csv, .jsonl or .ndjson manifest file
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.lower().endswith('.csv'):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+
+        for index, row in enumerate(rows):
+            item = {key: value for key, value in row.items() if value not in (None, '')}
+            item.setdefault('sku', f"item-{index:06d}")
+            yield item
+
+def _output_name(sku: str) -> str:
+    # The digest of the raw SKU keeps SKUs that sanitize alike (a/b, a_b) apart
+    digest = hashlib.sha1(str(sku).encode('utf-8')).hexdigest()[:8]
+    return f"{re.sub(r'[^A-Za-z0-9._-]+', '_', str(sku))}-{digest}.json"
+
+def process_item(
+    api_key: str,
+    item: Dict[str, Any],
+    config: Optional[Dict[str, Any]] = None,
+    base_dir: str = '.'
+) -> Dict[str, Any]:
+    """
+    Run the ad-set pipeline for one manifest item and return a result record.
+
+    Args:
+        api_key: Bria AI API key
+        item: Manifest item with 'sku' and 'image_path' and/or 'prompt'
+        config: Ad-set configuration shared by all items
+        base_dir: Directory that relative image paths are resolved against
+    """
+    item_config = dict(config or {})
+    if 'scene_description' in item:
+        item_config['scene_description'] = item['scene_description']
+
+    start = time.time()
+    try:
+        image = item.get('image_path')
+        if image and not is_url(image):
+            with open(os.path.join(base_dir, image), 'rb') as f:
+                image = f.read()
+
+        result = generate_ad_set(api_key, image=image, prompt=item.get('prompt'), config=item_config)
+        return {
+            'sku': item['sku'],
+            'status': 'ok',
+            'result': result,
+            'urls': {stage: output.urls for stage, output in result.items()},
+            'elapsed': time.time() - start
+        }
+    except Exception as e:
+        return {
+            'sku': item['sku'],
+            'status': 'error',
+            'error': str(e),
+            'error_type': type(e).__name__,
+            'elapsed': time.time() - start
+        }
+
+def run_catalog(
+    api_key: str,
+    manifest_path: str,
+    output_dir: str,
+    config: Optional[Dict[str, Any]] = None,
+    workers: int = 8
+) -> Dict[str, Any]:
+    """
+    Run generate_ad_set over every item in a manifest using a worker pool.
+
+    Each finished item is written to <output_dir>/<sku>-<hash>.json as soon
+    as it completes and appended to <output_dir>/results.jsonl, so partial
+    runs still leave usable output behind. The manifest is read as items are
+    submitted, with at most twice the worker count queued or in flight, so
+    large catalogs are not held in memory. Size the shared client's pool to
+    match the worker count, e.g. set_client(BriaClient(pool_size=workers)).
+
+    Args:
+        api_key: Bria AI API key
+        manifest_path: CSV or JSONL manifest (see read_manifest)
+        output_dir: Directory that result files are written to
+        config: Ad-set configuration shared by all items
+        workers: Number of items processed concurrently
+
+    Returns:
+        Dict with 'total', 'succeeded', 'failed' and 'elapsed' counts
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    summary = {'total': 0, 'succeeded': 0, 'failed': 0}
+    start = time.time()
+
+    with open(os.path.join(output_dir, 'results.jsonl'), 'a', encoding='utf-8') as results_file, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        items = read_manifest(manifest_path)
+        pending = set()
+        while True:
+            for item in items:
+                pending.add(executor.submit(
+                    contextvars.copy_context().run, process_item, api_key, item, config, base_dir
+                ))
+                if len(pending) >= 2 * workers:
+                    break
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                record = future.result()
+                with open(os.path.join(output_dir, _output_name(record['sku'])), 'w', encoding='utf-8') as f:
+                    json.dump(record, f, indent=2)
+
+                results_file.write(json.dumps(record) + '\n')
+                results_file.flush()
+                summary['total'] += 1
+                summary['succeeded' if record['status'] == 'ok' else 'failed'] += 1
+
+    summary['elapsed'] = time.time() - start
+    return summary
+
+__all__ = ['read_manifest', 'process_item', 'run_catalog']
@@ -0,0 +1,140 @@
+"""
+Throughput and memory benchmark for the services client layer.
+
+Runs entirely offline against the local mock Bria API: every scenario sends
+real HTTP requests through the services package, so payload preparation,
+encoding, pooling, retries and response handling are all measured, while
+the server side costs exactly the configured latency. Run from the directory
+containing the services package:
+
+    python -m services.benchmarks.bench_client --requests 200 --concurrency 16 --latency 0.05
+"""
+from typing import Any, Callable, Dict
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import asyncio
+import io
+import resource
+import sys
+import time
+import tracemalloc
+from PIL import Image
+from services import BriaClient, MetricsRegistry, RetryPolicy, aio, create_packshot, generative_fill, set_client
+from services.generate_ad_set import generate_ad_set
+from services.benchmarks.mock_server import MockBriaServer
+
+def make_image(megapixels: float, mode: str = 'RGB') -> bytes:
+    side = int((megapixels * 1e6) ** 0.5)
+    img = Image.effect_noise((side, side), 48).convert(mode)
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG' if mode == 'L' else 'JPEG', quality=92)
+    return buffer.getvalue()
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def run_threads(func: Callable[[int], Any], count: int, concurrency: int):
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(func, range(count)))
+
+def run_async(make_call: Callable[[aio.AsyncBriaClient, int], Any], count: int, concurrency: int,
+              base_url: str, metrics: MetricsRegistry):
+    # A fresh client per run, since its session belongs to the run's event loop
+    async def main():
+        async with aio.AsyncBriaClient(base_url=base_url, max_concurrency=concurrency, metrics=metrics) as client:
+            await asyncio.gather(*(make_call(client, i) for i in range(count)))
+    asyncio.run(main())
+
+def measure(name: str, scenario: Callable[[], None], calls: int, metrics: MetricsRegistry,
+            server: MockBriaServer, trace_memory: bool) -> Dict[str, Any]:
+    """Run one scenario and summarize throughput, latency and memory."""
+    metrics.reset()
+    server.reset_stats()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    scenario()
+    elapsed = time.perf_counter() - start
+    peak_traced = tracemalloc.get_traced_memory()[1] / 1e6 if trace_memory else None
+    if trace_memory:
+        tracemalloc.stop()
+
+    summary = metrics.summary()
+    total = sum(stats['count'] for stats in summary.values())
+    return {
+        'name': name,
+        'calls': calls,
+        'requests': total,
+        'elapsed': elapsed,
+        'throughput': calls / elapsed,
+        'p50': max((stats['latency'].get('p50', 0.0) for stats in summary.values()), default=0.0),
+        'p95': max((stats['latency'].get('p95', 0.0) for stats in summary.values()), default=0.0),
+        'upload_mb': sum(stats['upload_bytes'] for stats in summary.values()) / 1e6,
+        'peak_traced_mb': peak_traced,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200, help='calls per scenario')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=0.05, help='mock server response delay in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='share of 429/503 responses')
+    parser.add_argument('--image-mp', type=float, default=4.0, help='synthetic image size in megapixels')
+    parser.add_argument('--trace-memory', action='store_true', help='report tracemalloc peaks (slows every scenario)')
+    args = parser.parse_args()
+
+    image = make_image(args.image_mp)
+    mask = make_image(args.image_mp, mode='L')
+    metrics = MetricsRegistry()
+
+    with MockBriaServer(latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate) as server:
+        client = BriaClient(
+            base_url=server.base_url,
+            pool_size=args.concurrency,
+            retry=RetryPolicy(max_attempts=6, base_delay=0.05),
+            failure_threshold=10 ** 6,
+            metrics=metrics
+        )
+        set_client(client)
+        ad_set_config = {'create_packshot': True, 'add_shadow': True, 'lifestyle_shot': True,
+                         'scene_description': 'on a marble counter'}
+        count = args.requests
+
+        scenarios = [
+            ('packshot (threads)', lambda: run_threads(
+                lambda i: create_packshot('bench-key', image), count, args.concurrency), count),
+            ('packshot (url, threads)', lambda: run_threads(
+                lambda i: create_packshot('bench-key', 'https://example.com/product.jpg'), count, args.concurrency),
+             count),
+            ('gen_fill (threads)', lambda: run_threads(
+                lambda i: generative_fill('bench-key', image, mask, 'a vase of flowers'), count, args.concurrency),
+             count),
+            ('packshot (asyncio)', lambda: run_async(
+                lambda c, i: aio.create_packshot('bench-key', image, client=c), count, args.concurrency,
+                server.base_url, metrics), count),
+            ('generate_ad_set (threads)', lambda: run_threads(
+                lambda i: generate_ad_set('bench-key', image=image, config=ad_set_config),
+                max(1, count // 3), args.concurrency), max(1, count // 3)),
+        ]
+        print(f"mock latency {args.latency * 1000:.0f} ms, failure rate {args.failure_rate:.0%}, "
+              f"image {args.image_mp:.1f} MP ({len(image) / 1e6:.1f} MB), concurrency {args.concurrency}")
+        header = f"{'scenario':<28}{'calls/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'upload MB':>11}{'peak RSS MB':>13}"
+        if args.trace_memory:
+            header += f"{'traced MB':>11}"
+        print(header)
+        for name, scenario, calls in scenarios:
+            result = measure(name, scenario, calls, metrics, server, args.trace_memory)
+            line = (f"{name:<28}{result['throughput']:>9.1f}{result['p50'] * 1000:>9.1f}{result['p95'] * 1000:>9.1f}"
+                    f"{result['upload_mb']:>11.1f}{result['peak_rss_mb']:>13.1f}")
+            if args.trace_memory:
+                line += f"{result['peak_traced_mb']:>11.1f}"
+            print(line)
+
+        client.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""
+Throughput benchmark for services.filters.
+
+Reports megapixels per second for each filter on a synthetic RGB image.
+Run from the directory containing the services package:
+
+    python -m services.benchmarks.bench_filters --width 3840 --height 2160
+"""
+import argparse
+import time
+from PIL import Image
+from services.filters import FILTERS, apply_filter
+
+def make_image(width: int, height: int) -> Image.Image:
+    # Gradient noise so the filters cannot take any constant-colour shortcuts
+    return Image.effect_noise((width, height), 64).convert('RGB').point(lambda v: (v * 7) % 256)
+
+def bench(img: Image.Image, filter_type: str, repeat: int) -> float:
+    """Return megapixels per second for filter_type, using the best of repeat runs."""
+    megapixels = img.width * img.height / 1e6
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        apply_filter(img, filter_type).load()
+        best = min(best, time.perf_counter() - start)
+    return megapixels / best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--width', type=int, default=3840)
+    parser.add_argument('--height', type=int, default=2160)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    img = make_image(args.width, args.height)
+    print(f"{args.width}x{args.height} ({args.width * args.height / 1e6:.1f} MP), best of {args.repeat}")
+    for filter_type in FILTERS:
+        print(f"{filter_type:>14}: {bench(img, filter_type, args.repeat):8.1f} MP/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Cold-start benchmark for importing the services package.
+
+Each statement runs in a fresh interpreter, so nothing is cached in
+sys.modules; the median of several runs is reported together with the
+number of modules the statement loaded. Run from the directory containing
+the services package:
+
+    python -m services.benchmarks.bench_import --runs 7
+    python -m services.benchmarks.bench_import --importtime "from services import create_packshot"
+"""
+from typing import List, Optional, Tuple
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import services
+
+STATEMENTS = [
+    "import services",
+    "from services import create_packshot",
+    "from services import BriaClient, BriaResult",
+    "from services import generate_hd_image, lifestyle_shot_by_text",
+    "from services import submit",
+    "from services import aio",
+    "from services.generate_ad_set import generate_ad_set",
+    "from services import *",
+]
+
+# Runs in the child interpreter; prints elapsed seconds and modules loaded
+_PROBE = """
+import json, sys, time
+before = len(sys.modules)
+start = time.perf_counter()
+exec(compile({statement!r}, "<bench>", "exec"))
+print(json.dumps([time.perf_counter() - start, len(sys.modules) - before]))
+"""
+
+
+def _child_env() -> dict:
+    env = dict(os.environ)
+    root = os.path.dirname(os.path.abspath(services.__path__[0]))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [root, env.get("PYTHONPATH")]))
+    return env
+
+
+def time_statement(statement: str, runs: int) -> Tuple[float, int]:
+    """Return the median seconds and the module count for one import statement."""
+    env = _child_env()
+    samples: List[float] = []
+    modules = 0
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(statement=statement)],
+            check=True, capture_output=True, text=True, env=env
+        ).stdout
+        elapsed, modules = json.loads(output.strip().splitlines()[-1])
+        samples.append(elapsed)
+    return statistics.median(samples), modules
+
+
+def show_importtime(statement: str, top: int = 15) -> None:
+    """Print the modules with the largest cumulative import time for a statement."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        check=True, capture_output=True, text=True, env=_child_env()
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.rstrip()))
+    for cumulative, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1000:>9.1f} ms  {name}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per statement')
+    parser.add_argument('--importtime', metavar='STATEMENT', help='show the slowest modules for one statement instead')
+    args = parser.parse_args(argv)
+
+    if args.importtime:
+        show_importtime(args.importtime)
+        return
+
+    print(f"{'statement':<62}{'median ms':>11}{'modules':>9}")
+    for statement in STATEMENTS:
+        elapsed, modules = time_statement(statement, args.runs)
+        print(f"{statement:<62}{elapsed * 1000:>11.1f}{modules:>9}")
+
+if __name__ == '__main__':
+    main()
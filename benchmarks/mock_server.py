@@ -0,0 +1,219 @@
+"""
+Local stand-in for the Bria API, for benchmarks and offline development.
+
+Implements the request contracts used by the services package and answers
+with responses shaped like the real API, after a configurable delay and with
+a configurable share of 429/503 failures. Result URLs point back at the
+server, which serves a small PNG for them. Run it standalone and point the
+app or scripts at it:
+
+    python -m services.benchmarks.mock_server --port 8765 --latency 0.5
+    BRIA_API_BASE_URL=http://127.0.0.1:8765/v1 streamlit run app.py
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import io
+import itertools
+import json
+import random
+import threading
+import time
+from PIL import Image
+
+# endpoint -> (required fields, alternatives where one of each group is required)
+CONTRACTS: Dict[str, Tuple[Tuple[str, ...], Tuple[Tuple[str, ...], ...]]] = {
+    "product/packshot": ((), (("file", "image_url"),)),
+    "product/shadow": ((), (("file", "image_url"),)),
+    "product/lifestyle_shot_by_text": (("scene_description",), (("file", "image_url"),)),
+    "product/lifestyle_shot_by_image": ((), (("file", "image_url"), ("ref_image_file", "ref_image_url"))),
+    "gen_fill": (("prompt",), (("file", "image_url"), ("mask_file", "mask_url"))),
+    "erase_foreground": ((), (("file", "image_url"),)),
+    "prompt_enhancer": (("prompt",), ()),
+    "text-to-image/hd": (("prompt",), ()),
+}
+
+# Endpoints answering with {"result_url": ...}; the others return a list of result variations
+SINGLE_RESULT_ENDPOINTS = ("product/packshot", "product/shadow", "erase_foreground")
+
+
+def _result_png() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (200, 120, 40)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class MockBriaServer:
+    """
+    Threaded HTTP server that mimics the Bria endpoints.
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        latency: Seconds each API response is delayed
+        jitter: Extra random delay of up to this many seconds
+        failure_rate: Share of API requests answered with a failure status
+        failure_statuses: Statuses failures are drawn from (429 responses carry Retry-After)
+        retry_after: Retry-After seconds sent with 429 responses
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        failure_statuses: Tuple[int, ...] = (429, 503),
+        retry_after: float = 0.1
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failure_statuses = failure_statuses
+        self.retry_after = retry_after
+        self.requests: Dict[str, int] = {}
+        self.failures: Dict[str, int] = {}
+        self.bytes_received = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._png = _result_png()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._server.request_queue_size = 1024
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockBriaServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-bria", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "MockBriaServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.failures.clear()
+            self.bytes_received = 0
+
+    def _result_url(self) -> str:
+        return f"{self.base_url.rsplit('/v1', 1)[0]}/results/{next(self._ids)}.png"
+
+    def respond(self, endpoint: str, data: Dict[str, Any]) -> Tuple[int, Dict[str, str], Dict[str, Any]]:
+        """Return the (status, headers, body) the API would send for a request."""
+        contract = next((CONTRACTS[prefix] for prefix in CONTRACTS if endpoint.startswith(prefix)), None)
+        if contract is None:
+            return 404, {}, {"error": f"Unknown endpoint {endpoint}"}
+
+        required, alternatives = contract
+        missing = [field for field in required if not data.get(field)]
+        missing += [" or ".join(group) for group in alternatives if not any(data.get(field) for field in group)]
+        if missing:
+            return 400, {}, {"error": f"Missing required fields: {', '.join(missing)}"}
+
+        if self.failure_rate and random.random() < self.failure_rate:
+            status = random.choice(self.failure_statuses)
+            with self._lock:
+                self.failures[endpoint] = self.failures.get(endpoint, 0) + 1
+            headers = {"Retry-After": str(self.retry_after)} if status == 429 else {}
+            return status, headers, {"error": "Simulated failure"}
+
+        if endpoint.startswith("prompt_enhancer"):
+            return 200, {}, {"prompt variations": f"{data['prompt']}, studio lighting, high detail"}
+        if endpoint.startswith(SINGLE_RESULT_ENDPOINTS):
+            return 200, {}, {"result_url": self._result_url()}
+
+        count = max(1, min(int(data.get("num_results", 1)), 4))
+        seed = data.get("seed")
+        return 200, {}, {"result": [
+            {"urls": [self._result_url()], "seed": seed if seed is not None else random.randrange(2 ** 31)}
+            for _ in range(count)
+        ]}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length)
+                endpoint = self.path.split("?", 1)[0]
+                endpoint = endpoint[len("/v1/"):] if endpoint.startswith("/v1/") else endpoint.lstrip("/")
+                with server._lock:
+                    server.requests[endpoint] = server.requests.get(endpoint, 0) + 1
+                    server.bytes_received += len(raw)
+
+                if not self.headers.get("api_token"):
+                    status, headers, body = 401, {}, {"error": "Missing api_token header"}
+                else:
+                    try:
+                        data = json.loads(raw)
+                    except ValueError:
+                        status, headers, body = 400, {}, {"error": "Request body is not JSON"}
+                    else:
+                        status, headers, body = server.respond(endpoint, data)
+
+                delay = server.latency + (random.uniform(0, server.jitter) if server.jitter else 0)
+                if delay:
+                    time.sleep(delay)
+                self._send(status, json.dumps(body).encode("utf-8"), "application/json", headers)
+
+            def do_GET(self):
+                if self.path.startswith("/results/"):
+                    self._send(200, server._png, "image/png", {"ETag": '"mock"'})
+                else:
+                    self._send(404, b"", "text/plain")
+
+            do_HEAD = do_GET
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds each response is delayed')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random delay of up to this many seconds')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='share of requests answered with 429/503')
+    args = parser.parse_args(argv)
+
+    server = MockBriaServer(args.host, args.port, args.latency, args.jitter, args.failure_rate)
+    print(f"Mock Bria API listening on {server.base_url}")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == '__main__':
+    main()
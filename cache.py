@@ -0,0 +1,226 @@
+from typing import Dict, Any, Optional
+from collections import OrderedDict
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+# Endpoints whose output depends only on the input image and parameters
+DETERMINISTIC_ENDPOINTS = (
+    "product/packshot",
+    "product/shadow",
+    "erase_foreground",
+)
+
+
+def is_cacheable(endpoint: str, data: Dict[str, Any]) -> bool:
+    """
+    Return whether a request is safe to answer from the cache.
+
+    Generative endpoints are only cacheable when a seed pins their output.
+    """
+    endpoint = endpoint.lstrip("/")
+    if endpoint.startswith(DETERMINISTIC_ENDPOINTS):
+        return True
+    return data.get("seed") is not None
+
+def cache_key(endpoint: str, data: Dict[str, Any]) -> str:
+    """
+    Build a content-addressed key from the endpoint, image bytes and parameters.
+
+    Image bytes are replaced by their SHA-256 digest and the remaining
+    payload is serialized with sorted keys, so equal requests map to the same
+    key regardless of argument order.
+    """
+    normalized = {}
+    for field, value in data.items():
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            value = "sha256:" + hashlib.sha256(value).hexdigest()
+        normalized[field] = value
+
+    payload = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{endpoint.lstrip('/')}\n{payload}".encode("utf-8")).hexdigest()
+
+
+class CacheBackend:
+    """
+    Base class for response cache backends.
+
+    Subclasses implement _get, _set and clear, holding self._lock while they
+    touch their storage; hit and miss counters are kept here under the same
+    lock. Backends doing disk I/O set blocking, so async callers use them
+    from a worker thread.
+
+    Args:
+        ttl: Seconds an entry stays valid (None keeps entries until evicted)
+        max_entries: Maximum number of entries before the least recently used are evicted
+    """
+
+    blocking = False
+
+    def __init__(self, ttl: Optional[float] = 3600, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # Reentrant so get() can count under the lock that _get() takes
+        self._lock = threading.RLock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._set(key, value)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def _set(self, key: str, value: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemoryCache(CacheBackend):
+    """
+    In-process LRU cache.
+
+    Least recently used entries are evicted once either max_entries or
+    max_bytes is exceeded; an entry's size is that of its JSON encoding, so
+    a few large responses cannot grow the cache without bound.
+
+    Args:
+        ttl: Seconds an entry stays valid (None keeps entries until evicted)
+        max_entries: Maximum number of entries
+        max_bytes: Maximum total size of the cached responses (None for no limit)
+    """
+
+    def __init__(self, ttl: Optional[float] = 3600, max_entries: int = 1024, max_bytes: Optional[int] = 64 * 1024 * 1024):
+        super().__init__(ttl=ttl, max_entries=max_entries)
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created, value, size = entry
+            if self._expired(created):
+                del self._entries[key]
+                self.bytes -= size
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key: str, value: Dict[str, Any]) -> None:
+        size = len(json.dumps(value, separators=(",", ":"), default=str))
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[2]
+            if self.max_bytes is not None and size > self.max_bytes:
+                return  # Would evict everything else and still not fit
+            self._entries[key] = (time.time(), value, size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self.bytes > self.max_bytes
+            ):
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**super().stats(), "bytes": self.bytes}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    On-disk cache stored in a SQLite database, shared across processes and restarts.
+
+    Args:
+        path: Database file path
+        ttl: Seconds an entry stays valid (None keeps entries until evicted)
+        max_entries: Maximum number of entries before the least recently used are evicted
+    """
+
+    blocking = True
+
+    def __init__(self, path: str = "bria_cache.sqlite", ttl: Optional[float] = 86400, max_entries: int = 100000):
+        super().__init__(ttl=ttl, max_entries=max_entries)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if self._expired(created):
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+            return json.loads(value)
+
+    def _set(self, key: str, value: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now, now)
+            )
+            if self.ttl is not None:
+                self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+__all__ = ['CacheBackend', 'MemoryCache', 'SQLiteCache', 'cache_key', 'is_cacheable']
@@ -0,0 +1,507 @@
+"""
+Command-line batch tool for the Bria services.
+
+Runs one operation over many inputs concurrently and writes one JSON line
+per input with its result URLs (or error). Inputs are file paths, globs and
+URLs given on the command line, or rows of a CSV/JSONL manifest whose
+columns override the command's options per item:
+
+    python -m services packshot "products/**/*.jpg" --workers 16 -o packshots.jsonl
+    python -m services lifestyle-text --manifest catalog.csv --num-results 2 --wait
+    python -m services hd-generate "a red sneaker on a beach" "a watch on marble"
+
+The API key is read from --api-key or BRIA_API_KEY.
+"""
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, TextIO, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import contextvars
+import glob
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from .batch import read_manifest
+from .client import BriaClient, set_client
+from .erase_foreground import erase_foreground
+from .generative_fill import generative_fill
+from .hd_image_generation import generate_hd_image
+from .journal import DONE, FAILED, SUBMITTED, JobJournal, job_key
+from .lifestyle_shot import lifestyle_shot_by_image, lifestyle_shot_by_text
+from .log import configure_logging
+from .packshot import create_packshot
+from .prompt_enhancement import request_prompt_enhancement
+from .ratelimit import MemoryRateLimiter
+from .results import BriaResult
+from .shadow import add_shadow
+from .upload import is_url
+
+
+def _flag(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y", "on")
+
+
+class Option(NamedTuple):
+    """A command option, settable per item from a manifest column of the same name."""
+    name: str
+    param: str  # Keyword argument of the service function
+    type: Callable[[Any], Any]
+    default: Any
+    help: str
+    required: bool = False
+    path: bool = False  # Image path, resolved against the manifest directory
+
+
+class Command(NamedTuple):
+    func: Callable[..., Any]
+    input_param: str  # Parameter receiving each input
+    prompts: bool  # Inputs are prompts rather than images
+    help: str
+    options: List[Option]
+
+
+MODERATION = Option('content_moderation', 'content_moderation', _flag, False, 'enable content moderation')
+NUM_RESULTS = Option('num_results', 'num_results', int, 4, 'variations per input')
+SYNC = Option('sync', 'sync', _flag, False, 'ask the API to wait for the results')
+PLACEMENT = Option('placement_type', 'placement_type', str, 'original', 'product placement type')
+
+COMMANDS: Dict[str, Command] = {
+    'packshot': Command(create_packshot, 'image_data', False, 'Create professional packshots', [
+        Option('background_color', 'background_color', str, '#FFFFFF', "hex color or 'transparent'"),
+        Option('force_rmbg', 'force_rmbg', _flag, False, 'remove the background even if the image has alpha'),
+        MODERATION,
+    ]),
+    'shadow': Command(add_shadow, 'image_data', False, 'Add shadows to product images', [
+        Option('shadow_type', 'shadow_type', str, 'regular', "'regular' or 'float'"),
+        Option('background_color', 'background_color', str, None, 'hex color (transparent by default)'),
+        Option('force_rmbg', 'force_rmbg', _flag, False, 'remove the background even if the image has alpha'),
+        MODERATION,
+    ]),
+    'lifestyle-text': Command(lifestyle_shot_by_text, 'image_data', False, 'Place products in a described scene', [
+        Option('scene_description', 'scene_description', str, None, 'scene to place the product in', required=True),
+        PLACEMENT, NUM_RESULTS, SYNC,
+        Option('original_quality', 'original_quality', _flag, False, 'keep the original image resolution'),
+        MODERATION,
+    ]),
+    'lifestyle-image': Command(lifestyle_shot_by_image, 'image_data', False, 'Place products in a reference scene', [
+        Option('reference', 'reference_image', str, None, 'reference scene image or URL', required=True, path=True),
+        Option('ref_image_influence', 'ref_image_influence', float, 1.0, 'influence of the reference image (0-1)'),
+        PLACEMENT, NUM_RESULTS, SYNC,
+        Option('original_quality', 'original_quality', _flag, False, 'keep the original image resolution'),
+        MODERATION,
+    ]),
+    'gen-fill': Command(generative_fill, 'image_data', False, 'Generate content in a masked area', [
+        Option('mask', 'mask_data', str, None, 'mask image or URL (white marks the area)', required=True, path=True),
+        Option('prompt', 'prompt', str, None, 'what to generate in the masked area', required=True),
+        Option('negative_prompt', 'negative_prompt', str, None, 'what to avoid'),
+        NUM_RESULTS, SYNC,
+        Option('seed', 'seed', int, None, 'seed for reproducible results'),
+        MODERATION,
+    ]),
+    'erase': Command(erase_foreground, 'image_data', False, 'Erase the foreground of images', [MODERATION]),
+    'hd-generate': Command(generate_hd_image, 'prompt', True, 'Generate HD images from prompts', [
+        Option('num_results', 'num_results', int, 1, 'images per prompt'),
+        Option('aspect_ratio', 'aspect_ratio', str, '1:1', 'e.g. 1:1, 16:9 or 4:5'),
+        Option('negative_prompt', 'negative_prompt', str, '', 'what to avoid'),
+        Option('seed', 'seed', int, None, 'seed for reproducible results'),
+        MODERATION,
+    ]),
+    # The raising variant, so a failed enhancement is recorded as failed and retried on resume
+    'enhance-prompt': Command(request_prompt_enhancement, 'prompt', True, 'Enhance prompts', []),
+}
+
+
+def expand_inputs(patterns: List[str]) -> List[str]:
+    """
+    Expand globs into sorted file paths; URLs and existing paths are kept as given.
+
+    Raises:
+        ValueError: If a pattern matches nothing
+    """
+    inputs: List[str] = []
+    for pattern in patterns:
+        if is_url(pattern):
+            inputs.append(pattern)
+            continue
+        matches = sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+        if not matches and os.path.isfile(pattern):
+            matches = [pattern]
+        if not matches:
+            raise ValueError(f"No files match {pattern}")
+        inputs.extend(matches)
+    return inputs
+
+
+def read_items(command: Command, args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Build the work items from the command line inputs and/or the manifest."""
+    if command.prompts:
+        items = [{'input': prompt} for prompt in args.inputs]
+    else:
+        items = [{'input': path} for path in expand_inputs(args.inputs)]
+
+    if args.manifest:
+        base_dir = os.path.dirname(os.path.abspath(args.manifest))
+        input_column = 'prompt' if command.prompts else 'image_path'
+        path_options = {option.name for option in command.options if option.path}
+        for row in read_manifest(args.manifest):
+            item = dict(row)
+            if input_column not in item:
+                raise ValueError(f"Manifest row {row.get('sku')} has no '{input_column}' column")
+            item['input'] = item.pop(input_column)
+            for name in path_options | ({'input'} if not command.prompts else set()):
+                if name in item and not is_url(item[name]):
+                    item[name] = os.path.join(base_dir, item[name])
+            items.append(item)
+    return items
+
+
+def build_kwargs(command: Command, item: Dict[str, Any], args: argparse.Namespace) -> Dict[str, Any]:
+    """Return the service function arguments for one item, item values overriding options."""
+    kwargs: Dict[str, Any] = {command.input_param: item['input']}
+    for option in command.options:
+        value = item[option.name] if option.name in item else getattr(args, option.name)
+        if value is None:
+            if option.required:
+                raise ValueError(f"Missing --{option.name.replace('_', '-')}")
+            continue
+        kwargs[option.param] = option.type(value)
+    return kwargs
+
+
+class Progress:
+    """Reports completed items and throughput on stderr, at most every interval seconds."""
+
+    def __init__(self, total: int, stream: TextIO = sys.stderr, interval: float = 1.0, enabled: bool = True):
+        self.total = total
+        self.stream = stream
+        self.interval = interval
+        self.enabled = enabled
+        self.succeeded = 0
+        self.failed = 0
+        self.start = time.perf_counter()
+        self._last = 0.0
+        self._tty = stream.isatty()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def line(self) -> str:
+        done = self.succeeded + self.failed
+        return (f"{done}/{self.total} done, {self.failed} failed, "
+                f"{done / self.elapsed if self.elapsed else 0.0:.2f} items/s, {self.elapsed:.1f}s")
+
+    def update(self, ok: bool) -> None:
+        if ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        now = time.perf_counter()
+        if self.enabled and (now - self._last >= self.interval or self.succeeded + self.failed == self.total):
+            self._last = now
+            self.stream.write(("\r" if self._tty else "") + self.line() + ("" if self._tty else "\n"))
+            self.stream.flush()
+
+    def finish(self) -> None:
+        if self.enabled and self._tty:
+            self.stream.write("\n")
+        self.stream.flush()
+
+
+def _record(
+    item: Dict[str, Any],
+    start: float,
+    result: Any = None,
+    error: Optional[BaseException] = None,
+    resumed: bool = False
+) -> Dict[str, Any]:
+    record: Dict[str, Any] = {'input': str(item['input'])}
+    if 'sku' in item:
+        record['sku'] = item['sku']
+    if error is not None:
+        record.update({'status': 'error', 'error': str(error), 'error_type': type(error).__name__})
+    elif isinstance(result, BriaResult):
+        record.update({'status': 'ok', 'urls': result.urls, 'seeds': result.seeds})
+    else:
+        record.update({'status': 'ok', 'result': result})
+    if resumed:
+        record['resumed'] = True
+    record['elapsed'] = time.perf_counter() - start
+    return record
+
+
+class BatchRun:
+    """
+    A batch started by run_items; result records arrive on records as items finish.
+
+    Items are handed to the worker pool as earlier ones finish, with at most
+    twice the worker count queued or in flight, so a large manifest is never
+    submitted all at once.
+    """
+
+    def __init__(
+        self,
+        records: "queue.Queue[Dict[str, Any]]",
+        executor: ThreadPoolExecutor,
+        feeder: threading.Thread,
+        stop: threading.Event,
+        slots: threading.Semaphore,
+        polling: threading.Lock
+    ):
+        self.records = records
+        self._executor = executor
+        self._feeder = feeder
+        self._stop = stop
+        self._slots = slots
+        self._polling = polling
+
+    def cancel(self) -> None:
+        """
+        Stop submitting items and drop the queued ones; requests already sent keep running.
+
+        Jobs still being polled are abandoned: their results are no longer
+        recorded, and a journal keeps them as submitted.
+        """
+        with self._polling:
+            self._stop.set()
+        self._slots.release()  # Wake the feeder if it is waiting for a slot
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def join(self) -> None:
+        """Wait until every request that was sent has returned and been recorded."""
+        self._feeder.join()
+        self._executor.shutdown(wait=True)
+
+
+def run_items(
+    name: str,
+    api_key: str,
+    calls: List[Tuple[Dict[str, Any], Any]],
+    workers: int,
+    wait: bool = False,
+    deadline: Optional[float] = None,
+    journal: Optional[JobJournal] = None
+) -> BatchRun:
+    """
+    Run a command for every (item, kwargs) pair on a worker pool, returning the running batch.
+
+    With wait, the result URLs of each response are polled by the shared job
+    poller after the request returns, so workers move on to the next item
+    instead of blocking while images are generated. With a journal, every
+    job's state is recorded; items already done in an earlier run are not
+    sent again, and items that were submitted but not finished are polled
+    again instead of being resubmitted.
+
+    Args:
+        name: Command name
+        api_key: Bria AI API key
+        calls: Items paired with their service arguments (or the error building them)
+        workers: Number of requests in flight at once
+        wait: Poll until every result URL is ready
+        deadline: Seconds to wait for each result URL
+        journal: Journal to resume from and record into
+    """
+    command = COMMANDS[name]
+    records: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bria-cli")
+    slots = threading.Semaphore(2 * workers)
+    stop = threading.Event()
+    polling = threading.Lock()  # Held while a polled job records its outcome
+
+    def journal_record(item: Dict[str, Any], start: float, key: Optional[str], status: str,
+                       result: Any = None, error: Optional[BaseException] = None, flush: bool = False) -> None:
+        if journal is not None and key is not None:
+            journal.record(
+                key, status, operation=name, input=str(item['input']),
+                urls=result.urls if isinstance(result, BriaResult) else None, response=result,
+                error=str(error) if error is not None else None, elapsed=time.perf_counter() - start,
+                flush=flush
+            )
+
+    def finish(item: Dict[str, Any], start: float, key: Optional[str], result: Any = None,
+               error: Optional[BaseException] = None, resumed: bool = False) -> None:
+        if error is not None:
+            status = FAILED
+        elif isinstance(result, BriaResult) and not wait:
+            status = SUBMITTED  # Nothing checked that the URLs are ready
+        else:
+            status = DONE
+        journal_record(item, start, key, status, result, error)
+        records.put(_record(item, start, result=result, error=error, resumed=resumed))
+
+    def watch(item: Dict[str, Any], start: float, key: Optional[str], result: BriaResult, resumed: bool = False):
+        from .jobs import Job
+
+        def done(job: Job) -> None:
+            # After cancel() the journal may be closed; the job stays SUBMITTED and is re-polled next run
+            with polling:
+                if not stop.is_set():
+                    finish(item, start, key, result, job.exception(), resumed)
+
+        job = Job(item.get('sku') or str(item['input']), deadline=deadline)
+        job.add_done_callback(done)
+        job.start(result)
+
+    def task(item: Dict[str, Any], kwargs: Dict[str, Any], start: float) -> None:
+        try:
+            run(item, kwargs, start)
+        except Exception as e:
+            # Journal or input errors; every item must still produce a record
+            records.put(_record(item, start, error=e))
+        finally:
+            slots.release()
+
+    def run(item: Dict[str, Any], kwargs: Dict[str, Any], start: float) -> None:
+        key = None
+        if journal is not None:
+            key = job_key(name, kwargs)
+            entry = journal.get(key)
+            if entry is not None and entry.status in (DONE, SUBMITTED):
+                result = BriaResult(entry.response) if isinstance(entry.response, dict) else entry.response
+                if entry.status == SUBMITTED and wait:
+                    watch(item, start, key, result, resumed=True)
+                else:
+                    records.put(_record(item, start, result=result, resumed=True))
+                return
+
+        try:
+            result = command.func(api_key=api_key, **kwargs)
+        except Exception as e:
+            finish(item, start, key, error=e)
+            return
+        if wait and isinstance(result, BriaResult):
+            # Committed before polling so a crash from here on re-polls instead of resubmitting
+            journal_record(item, start, key, SUBMITTED, result, flush=True)
+            watch(item, start, key, result)
+        else:
+            finish(item, start, key, result)
+
+    def feed(context: contextvars.Context) -> None:
+        for item, kwargs in calls:
+            if isinstance(kwargs, Exception):
+                records.put(_record(item, time.perf_counter(), error=kwargs))
+                continue
+            slots.acquire()
+            if stop.is_set():
+                return
+            try:
+                executor.submit(context.copy().run, task, item, kwargs, time.perf_counter())
+            except RuntimeError:
+                return  # Cancelled between the check and the submit
+        executor.shutdown(wait=False)
+
+    feeder = threading.Thread(target=feed, args=(contextvars.copy_context(),), name="bria-cli-feeder", daemon=True)
+    feeder.start()
+    return BatchRun(records, executor, feeder, stop, slots, polling)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='python -m services', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True, metavar='command')
+
+    for name, command in COMMANDS.items():
+        sub = subparsers.add_parser(name, help=command.help, description=command.help)
+        sub.add_argument('inputs', nargs='*', metavar='prompt' if command.prompts else 'image',
+                         help='prompts' if command.prompts else 'image files, globs or URLs')
+        sub.add_argument('--manifest', help=f"CSV or JSONL manifest with a "
+                         f"'{'prompt' if command.prompts else 'image_path'}' column per item")
+        for option in command.options:
+            flag = '--' + option.name.replace('_', '-')
+            if option.type is _flag:
+                sub.add_argument(flag, dest=option.name, action='store_true', help=option.help)
+            else:
+                sub.add_argument(flag, dest=option.name, type=option.type, default=option.default, help=option.help)
+
+        sub.add_argument('-o', '--output', default='-', help='JSON lines file for results (default: stdout)')
+        sub.add_argument('-w', '--workers', type=int, default=8, help='requests in flight at once (default: 8)')
+        sub.add_argument('--wait', action='store_true', help='poll until every result URL is ready')
+        sub.add_argument('--deadline', type=float, default=None, help='seconds to wait for each result URL')
+        sub.add_argument('--journal', metavar='PATH',
+                         help='SQLite job journal; rerunning with it skips finished items and re-polls pending ones')
+        sub.add_argument('--rate-limit', type=float, default=None, metavar='PER_MINUTE',
+                         help='pace requests to this many per minute')
+        sub.add_argument('--api-key', default=os.getenv('BRIA_API_KEY'), help='Bria API key (default: $BRIA_API_KEY)')
+        sub.add_argument('--base-url', default=None, help='API base URL (default: $BRIA_API_BASE_URL)')
+        sub.add_argument('--log-level', default=None, help='log level for the services loggers')
+        sub.add_argument('-q', '--quiet', action='store_true', help='do not report progress')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    command = COMMANDS[args.command]
+
+    if not args.api_key:
+        parser.error("an API key is required (--api-key or BRIA_API_KEY)")
+    if not args.inputs and not args.manifest:
+        parser.error("give inputs or --manifest")
+    for option in command.options:
+        # Without a manifest there is nowhere else a required value can come from
+        if option.required and getattr(args, option.name) is None and not args.manifest:
+            parser.error(f"--{option.name.replace('_', '-')} is required")
+    try:
+        items = read_items(command, args)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    configure_logging(args.log_level)
+    client_kwargs: Dict[str, Any] = {'pool_size': args.workers}
+    if args.base_url:
+        client_kwargs['base_url'] = args.base_url
+    if args.rate_limit:
+        client_kwargs['rate_limiter'] = MemoryRateLimiter(per_minute=args.rate_limit)
+    client = BriaClient(**client_kwargs)
+    set_client(client)
+
+    calls = []
+    for item in items:
+        try:
+            calls.append((item, build_kwargs(command, item, args)))
+        except (TypeError, ValueError) as e:
+            calls.append((item, e))
+
+    progress = Progress(len(items), enabled=not args.quiet)
+    journal = JobJournal(args.journal) if args.journal else None
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    batch = run_items(args.command, args.api_key, calls, args.workers, wait=args.wait,
+                      deadline=args.deadline, journal=journal)
+
+    def write(record: Dict[str, Any]) -> None:
+        output.write(json.dumps(record) + '\n')
+        output.flush()
+        progress.update(record['status'] == 'ok')
+
+    try:
+        for _ in range(len(items)):
+            write(batch.records.get())
+    except KeyboardInterrupt:
+        batch.cancel()
+        progress.finish()
+        print("Interrupted; waiting for the requests already sent", file=sys.stderr)
+        batch.join()
+        while not batch.records.empty():
+            write(batch.records.get_nowait())
+        progress.finish()
+        return 130
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if journal is not None:
+            journal.close()
+        client.close()
+
+    progress.finish()
+    if not args.quiet:
+        print(f"{progress.succeeded} succeeded, {progress.failed} failed in {progress.elapsed:.1f}s "
+              f"({len(items) / progress.elapsed if progress.elapsed else 0.0:.2f} items/s)", file=sys.stderr)
+    return 1 if progress.failed else 0
+
+
+__all__ = ['COMMANDS', 'BatchRun', 'build_parser', 'expand_inputs', 'main', 'read_items', 'run_items']
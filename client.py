@@ -0,0 +1,326 @@
+from typing import Dict, Any, Optional, Union, Tuple
+import logging
+import os
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from .cache import CacheBackend, cache_key, is_cacheable
+from .errors import BriaError, FatalError, RateLimitedError, TransientError, error_for_status
+from .log import get_logger, redact, truncate
+from .metrics import CallRecord, MetricsRegistry, get_metrics
+from .ratelimit import RateLimiter
+from .retry import CircuitBreaker, RetryPolicy
+from .streaming import JSONStreamBody
+
+logger = get_logger(__name__)
+
+DEFAULT_BASE_URL = "https://engine.prod.bria-api.com/v1"
+
+# Seconds to wait for a response, as a single value or a (connect, read) pair
+Timeout = Union[float, Tuple[float, float]]
+
+DEFAULT_TIMEOUT: Timeout = (10, 120)
+
+# Per-endpoint read timeouts, matched on the endpoint path prefix
+ENDPOINT_TIMEOUTS: Dict[str, Timeout] = {
+    "prompt_enhancer": (5, 30),
+    "erase_foreground": (10, 60),
+    "product/packshot": (10, 60),
+    "product/shadow": (10, 60),
+    "product/lifestyle_shot_by_text": (10, 180),
+    "product/lifestyle_shot_by_image": (10, 180),
+    "gen_fill": (10, 180),
+    "text-to-image/hd": (10, 180),
+}
+
+
+class BaseClient:
+    """
+    Endpoint configuration shared by the sync and async Bria clients.
+
+    Failed requests raise the typed errors from services.errors. Rate-limited
+    and transient failures are retried according to the retry policy, and
+    each endpoint has its own circuit breaker so a degraded endpoint fails
+    fast instead of tying up every worker. An optional rate limiter paces
+    requests per API key and endpoint before they are sent. Every call is
+    recorded as a CallRecord in the metrics registry.
+
+    Args:
+        base_url: API base URL (defaults to BRIA_API_BASE_URL or the production engine)
+        timeout: Fallback timeout for endpoints not listed in timeouts
+        timeouts: Per-endpoint timeouts keyed by endpoint path prefix
+        cache: Optional response cache for deterministic requests
+        retry: Retry policy (defaults to RetryPolicy(); RetryPolicy(max_attempts=1) disables retries)
+        failure_threshold: Consecutive transient failures that open an endpoint's circuit
+        reset_timeout: Seconds an open circuit waits before letting a trial call through
+        rate_limiter: Optional token-bucket limiter shared by every client that should pace together
+        metrics: Registry calls are recorded in (defaults to the shared registry)
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        timeouts: Optional[Dict[str, Timeout]] = None,
+        cache: Optional[CacheBackend] = None,
+        retry: Optional[RetryPolicy] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        self.base_url = (base_url or os.getenv("BRIA_API_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+        self.timeout = timeout
+        self.timeouts = dict(ENDPOINT_TIMEOUTS)
+        if timeouts:
+            self.timeouts.update(timeouts)
+        self.cache = cache
+        self.retry = retry or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+
+    def url(self, endpoint: str) -> str:
+        """Build the full URL for an endpoint path such as 'product/packshot'."""
+        return f"{self.base_url}/{endpoint.lstrip('/')}"
+
+    def timeout_for(self, endpoint: str) -> Timeout:
+        """Return the timeout for an endpoint, using the longest matching prefix."""
+        endpoint = endpoint.lstrip("/")
+        matches = [prefix for prefix in self.timeouts if endpoint.startswith(prefix)]
+        if not matches:
+            return self.timeout
+        return self.timeouts[max(matches, key=len)]
+
+    def cache_lookup(self, endpoint: str, data: Dict[str, Any]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Return the cache key for a request (None if uncacheable) and any cached response."""
+        if self.cache is None or not is_cacheable(endpoint, data):
+            return None, None
+        key = cache_key(endpoint, data)
+        return key, self.cache.get(key)
+
+    def breaker_for(self, endpoint: str) -> CircuitBreaker:
+        """Return the circuit breaker guarding an endpoint."""
+        endpoint = endpoint.lstrip("/")
+        with self._breakers_lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[endpoint]
+
+    def record_rate_limited(self, api_key: str, endpoint: str, error: BriaError) -> None:
+        """Hold back the endpoint's rate limiter bucket when the API answers 429 with Retry-After."""
+        if self.rate_limiter is not None and isinstance(error, RateLimitedError) and error.retry_after:
+            self.rate_limiter.penalize(api_key, endpoint, error.retry_after, self.url(endpoint))
+
+    def log_request(self, endpoint: str, url: str, headers: Dict[str, str], data: Dict[str, Any]) -> None:
+        # Redacting walks the payload, so only do it when debug output is on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("POST %s", url, extra={"endpoint": endpoint, "headers": redact(headers), "payload": redact(data)})
+
+    def log_response(self, endpoint: str, status: int, elapsed: float, text: str) -> None:
+        logger.info(
+            "POST %s -> %d in %.0f ms", endpoint, status, elapsed * 1000,
+            extra={"endpoint": endpoint, "status": status, "elapsed_ms": round(elapsed * 1000, 1)}
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Response body: %s", truncate(text), extra={"endpoint": endpoint})
+
+    def log_retry(self, endpoint: str, attempt: int, delay: float, error: BriaError) -> None:
+        logger.warning(
+            "Retrying %s in %.2f s after attempt %d failed: %s", endpoint, delay, attempt, truncate(str(error)),
+            extra={"endpoint": endpoint, "attempt": attempt, "delay": delay, "error_type": type(error).__name__}
+        )
+
+    def record_call(
+        self,
+        endpoint: str,
+        start: float,
+        attempts: int,
+        stats: Dict[str, Any],
+        error: Optional[Exception] = None
+    ) -> None:
+        """Record a finished call; stats holds the measurements of its last attempt."""
+        (self.metrics or get_metrics()).record(CallRecord(
+            endpoint=endpoint.lstrip("/"),
+            status=stats.get("status", getattr(error, "status_code", None)),
+            error=type(error).__name__ if error is not None else None,
+            encode_time=stats.get("encode_time", 0.0),
+            upload_bytes=stats.get("upload_bytes", 0),
+            ttfb=stats.get("ttfb"),
+            latency=time.perf_counter() - start,
+            response_bytes=stats.get("response_bytes", 0),
+            retries=max(0, attempts - 1)
+        ))
+
+    def headers(self, api_key: str) -> Dict[str, str]:
+        return {
+            'api_token': api_key,
+            'Accept': 'application/json',
+            'Content-Type': 'application/json'
+        }
+
+
+class BriaClient(BaseClient):
+    """
+    HTTP client for the Bria AI API backed by a pooled keep-alive session.
+
+    A single client reuses TCP/TLS connections across calls, so repeated
+    requests to the same host skip the handshake.
+
+    Args:
+        base_url: API base URL (defaults to BRIA_API_BASE_URL or the production engine)
+        pool_size: Maximum number of pooled connections kept open per host
+        timeout: Fallback timeout for endpoints not listed in timeouts
+        timeouts: Per-endpoint timeouts keyed by endpoint path prefix
+        cache: Optional response cache for deterministic requests
+        **kwargs: Retry and circuit breaker options (see BaseClient)
+    """
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        pool_size: int = 10,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        timeouts: Optional[Dict[str, Timeout]] = None,
+        cache: Optional[CacheBackend] = None,
+        **kwargs
+    ):
+        super().__init__(base_url=base_url, timeout=timeout, timeouts=timeouts, cache=cache, **kwargs)
+        self.pool_size = pool_size
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def post(self, endpoint: str, api_key: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST a JSON payload to an endpoint and return the decoded response.
+
+        Bytes values in the payload are file fields; they are streamed into
+        the request body as base64 strings.
+
+        Args:
+            endpoint: Endpoint path relative to the base URL
+            api_key: Bria AI API key
+            data: JSON request payload
+
+        Returns:
+            Dict containing the API response
+
+        Raises:
+            BriaError: A typed subclass once retries are exhausted or the circuit is open
+        """
+        key, cached = self.cache_lookup(endpoint, data)
+        if cached is not None:
+            logger.debug("Cache hit for %s", endpoint, extra={"endpoint": endpoint})
+            return cached
+
+        breaker = self.breaker_for(endpoint)
+        start = time.perf_counter()
+        stats: Dict[str, Any] = {}
+        attempt = 0
+        try:
+            while True:
+                attempt += 1
+                if self.rate_limiter is not None:
+                    self.rate_limiter.acquire(api_key, endpoint, self.url(endpoint))
+                breaker.before_call(endpoint)
+                try:
+                    result = self._send(endpoint, api_key, data, stats)
+                except BriaError as e:
+                    breaker.record_failure(e)
+                    self.record_rate_limited(api_key, endpoint, e)
+                    delay = self.retry.delay_for(e, attempt)
+                    if delay is None:
+                        raise
+                    self.log_retry(endpoint, attempt, delay, e)
+                    time.sleep(delay)
+                    continue
+                except BaseException:
+                    # Interrupted or not an API error: says nothing about the endpoint's health
+                    breaker.release_trial()
+                    raise
+                breaker.record_success()
+                break
+        except Exception as e:
+            self.record_call(endpoint, start, attempt, stats, e)
+            raise
+        self.record_call(endpoint, start, attempt, stats)
+
+        if key is not None:
+            self.cache.set(key, result)
+        return result
+
+    def _send(self, endpoint: str, api_key: str, data: Dict[str, Any], stats: Dict[str, Any]) -> Dict[str, Any]:
+        url = self.url(endpoint)
+        headers = self.headers(api_key)
+
+        self.log_request(endpoint, url, headers, data)
+
+        # A streamed body can only be read once, so every attempt builds its own
+        body = JSONStreamBody(data)
+        stats.clear()
+        stats["upload_bytes"] = len(body)
+        start = time.perf_counter()
+        try:
+            response = self.session.post(url, headers=headers, data=body, timeout=self.timeout_for(endpoint))
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            raise TransientError(f"Request to {url} failed: {str(e)}") from e
+        except requests.RequestException as e:
+            raise FatalError(f"Request to {url} failed: {str(e)}") from e
+        finally:
+            stats["encode_time"] = body.encode_time
+
+        # requests measures elapsed from sending until the response headers are parsed
+        stats["ttfb"] = response.elapsed.total_seconds()
+        stats["status"] = response.status_code
+        stats["response_bytes"] = len(response.content)
+
+        self.log_response(endpoint, response.status_code, time.perf_counter() - start, response.text)
+        if response.status_code >= 400:
+            raise error_for_status(
+                response.status_code, response.reason, url, response.headers.get("Retry-After"), response.text
+            )
+
+        try:
+            return response.json()
+        except ValueError as e:
+            raise FatalError(f"Invalid JSON response from {url}: {str(e)}", status_code=response.status_code) from e
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_default_client: Optional[BriaClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_client() -> BriaClient:
+    """Return the shared client used by the service functions."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = BriaClient()
+    return _default_client
+
+
+def set_client(client: Optional[BriaClient]) -> None:
+    """Replace the shared client, e.g. to change the pool size or base URL."""
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
+
+
+__all__ = ['BaseClient', 'BriaClient', 'get_client', 'set_client']
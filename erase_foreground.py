@@ -1,30 +1,15 @@
-from typing import Dict, Any, Optional
-import requests
-import base64
+from typing import Dict, Any, Optional, Tuple
+from .client import BriaClient, get_client
+from .errors import service_error
+from .results import BriaResult
+from .upload import ImageInput, image_fields
 
-def erase_foreground(
-    api_key: str,
-    image_data: bytes = None,
+def build_erase_foreground_request(
+    image_data: ImageInput = None,
     image_url: str = None,
     content_moderation: bool = False
-) -> Dict[str, Any]:
-    """
-    Erase the foreground from an image and generate the area behind it.
-    
-    Args:
-        api_key: Bria AI API key
-        image_data: Image data in bytes (optional if image_url provided)
-        image_url: URL of the image (optional if image_data provided)
-        content_moderation: Whether to enable content moderation
-    """
-    url = "https://engine.prod.bria-api.com/v1/erase_foreground"
-    
-    headers = {
-        'api_token': api_key,
-        'Accept': 'application/json',
-        'Content-Type': 'application/json'
-    }
-    
+) -> Tuple[str, Dict[str, Any]]:
+    """Build the endpoint and payload for an erase foreground request."""
     # Prepare request data
     data = {
         'content_moderation': content_moderation
@@ -32,26 +17,41 @@ def erase_foreground(
     
     # Add image data
     if image_url:
-        data['image_url'] = image_url
+        data['image_url'] = image_url  # Forwarded as given, whatever its scheme
     elif image_data:
-        data['file'] = base64.b64encode(image_data).decode('utf-8')
+        data.update(image_fields(image_data, "erase_foreground"))
     else:
         raise ValueError("Either image_data or image_url must be provided")
     
+    return "erase_foreground", data
+
+def erase_foreground(
+    api_key: str,
+    image_data: ImageInput = None,
+    image_url: str = None,
+    content_moderation: bool = False,
+    client: Optional[BriaClient] = None
+) -> BriaResult:
+    """
+    Erase the foreground from an image and generate the area behind it.
+    
+    Args:
+        api_key: Bria AI API key
+        image_data: Image bytes, file path or URL (optional if image_url provided)
+        image_url: URL of the image (optional if image_data provided)
+        content_moderation: Whether to enable content moderation
+        client: Optional BriaClient to send the request with (defaults to the shared client)
+    """
+    endpoint, data = build_erase_foreground_request(
+        image_data=image_data,
+        image_url=image_url,
+        content_moderation=content_moderation
+    )
+    
     try:
-        print(f"Making request to: {url}")
-        print(f"Headers: {headers}")
-        print(f"Data: {data}")
-        
-        response = requests.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        
-        print(f"Response status: {response.status_code}")
-        print(f"Response body: {response.text}")
-        
-        return response.json()
+        return BriaResult((client or get_client()).post(endpoint, api_key, data))
     except Exception as e:
-        raise Exception(f"Erase foreground failed: {str(e)}")
+        raise service_error("Erase foreground failed", e)
 
 # Export the function
-__all__ = ['erase_foreground'] 
\ No newline at end of file
+__all__ = ['erase_foreground', 'build_erase_foreground_request']
\ No newline at end of file
@@ -0,0 +1,120 @@
+from typing import Optional
+from email.utils import parsedate_to_datetime
+import time
+
+# Statuses worth retrying: the request was not processed or the service is briefly unavailable
+TRANSIENT_STATUSES = (408, 500, 502, 503, 504)
+
+
+class BriaError(Exception):
+    """
+    Base class for errors raised by Bria API calls.
+
+    Args:
+        message: Error description
+        status_code: HTTP status of the failed response, if there was one
+        retry_after: Seconds the server asked us to wait before retrying
+    """
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class TransientError(BriaError):
+    """Connection failure, timeout or 5xx response that may succeed on retry."""
+
+
+class RateLimitedError(BriaError):
+    """The API answered 429 Too Many Requests."""
+
+
+class ModerationRejectedError(BriaError):
+    """The API rejected the input or output in content moderation (422)."""
+
+
+class FatalError(BriaError):
+    """The request is invalid and retrying it cannot help (other 4xx responses)."""
+
+
+class CircuitOpenError(BriaError):
+    """The endpoint's circuit breaker is open, so the call was not attempted."""
+
+
+class ResultTimeoutError(BriaError):
+    """A result URL of an asynchronous request was not ready before its polling deadline."""
+
+
+class ResultCancelledError(BriaError):
+    """A result URL stopped being polled before it was ready, because its poller was closed."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def error_for_status(
+    status_code: int,
+    reason: str,
+    url: str,
+    retry_after: Optional[str] = None,
+    body: str = ""
+) -> BriaError:
+    """
+    Build the typed error for a failed HTTP response.
+
+    The message keeps the status code and the start of the response body, so
+    it reads like the HTTP error it replaces.
+    """
+    kind = "Client" if status_code < 500 else "Server"
+    message = f"{status_code} {kind} Error: {reason} for url: {url}"
+    if body:
+        message += f" - {body[:500]}"
+
+    if status_code == 429:
+        error_class = RateLimitedError
+    elif status_code == 422:
+        error_class = ModerationRejectedError
+    elif status_code in TRANSIENT_STATUSES:
+        error_class = TransientError
+    else:
+        error_class = FatalError
+    return error_class(message, status_code=status_code, retry_after=parse_retry_after(retry_after))
+
+
+def service_error(message: str, error: Exception) -> BriaError:
+    """
+    Prefix an error raised during a service call with the call's description.
+
+    Typed errors keep their class, status code and Retry-After so callers can
+    still tell them apart; anything else becomes a plain BriaError.
+    """
+    if isinstance(error, BriaError):
+        return type(error)(f"{message}: {str(error)}", status_code=error.status_code, retry_after=error.retry_after)
+    return BriaError(f"{message}: {str(error)}")
+
+
+__all__ = [
+    'BriaError',
+    'TransientError',
+    'RateLimitedError',
+    'ModerationRejectedError',
+    'FatalError',
+    'CircuitOpenError',
+    'ResultTimeoutError',
+    'ResultCancelledError',
+    'error_for_status',
+    'parse_retry_after',
+    'service_error',
+]
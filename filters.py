@@ -0,0 +1,218 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from functools import lru_cache
+import io
+from PIL import Image, ImageFilter
+
+# Sepia tone as an RGB -> RGB colour matrix, applied in one C-level pass
+SEPIA_MATRIX = (
+    0.393, 0.769, 0.189, 0,
+    0.349, 0.686, 0.168, 0,
+    0.272, 0.534, 0.131, 0,
+)
+
+ImageInput = Union[bytes, str, io.IOBase, Image.Image]
+
+# name -> function(img, **params) returning a new image
+_REGISTRY: Dict[str, Callable[..., Image.Image]] = {}
+
+def register_filter(name: str):
+    """
+    Register a filter function under a name so pipelines can refer to it.
+
+    The function receives a PIL image plus keyword parameters and returns a
+    new image:
+
+        @register_filter("invert")
+        def invert(img):
+            return ImageOps.invert(img.convert('RGB'))
+    """
+    def decorator(func: Callable[..., Image.Image]) -> Callable[..., Image.Image]:
+        _REGISTRY[name] = func
+        return func
+    return decorator
+
+def get_filter(name: str) -> Callable[..., Image.Image]:
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"Unknown filter '{name}'. Available filters: {', '.join(sorted(_REGISTRY))}")
+
+def available_filters() -> List[str]:
+    return sorted(_REGISTRY)
+
+def open_image(image: ImageInput) -> Image.Image:
+    """Open raw bytes, a path or a file-like object as a PIL image."""
+    if isinstance(image, Image.Image):
+        return image
+    if isinstance(image, (bytes, bytearray)):
+        return Image.open(io.BytesIO(image))
+    return Image.open(image)
+
+@lru_cache(maxsize=64)
+def _lut(kind: str, factor: float) -> Tuple[int, ...]:
+    if kind == "scale":
+        values = (value * factor for value in range(256))
+    else:
+        values = ((value - 128) * factor + 128 for value in range(256))
+    return tuple(max(0, min(255, int(v))) for v in values)
+
+def _apply_lut(img: Image.Image, lut: Tuple[int, ...]) -> Image.Image:
+    if img.mode not in ('L', 'RGB', 'RGBA'):
+        img = img.convert('RGB')
+    if img.mode == 'RGBA':
+        # Leave the alpha band untouched
+        return img.point(list(lut) * 3 + list(range(256)))
+    return img.point(list(lut) * len(img.getbands()))
+
+@register_filter("grayscale")
+def grayscale(img: Image.Image) -> Image.Image:
+    return img.convert('L')
+
+@register_filter("sepia")
+def sepia(img: Image.Image) -> Image.Image:
+    alpha = img.getchannel('A') if 'A' in img.getbands() else None
+    result = img.convert('RGB').convert('RGB', SEPIA_MATRIX)
+    if alpha is not None:
+        result.putalpha(alpha)
+    return result
+
+@register_filter("scale")
+def scale(img: Image.Image, factor: float = 1.5) -> Image.Image:
+    """Multiply every colour value by factor, clipping at 255."""
+    return _apply_lut(img, _lut("scale", factor))
+
+@register_filter("contrast")
+def contrast(img: Image.Image, factor: float = 1.5) -> Image.Image:
+    """Stretch colour values away from mid-grey by factor."""
+    return _apply_lut(img, _lut("contrast", factor))
+
+@register_filter("blur")
+def blur(img: Image.Image, radius: Optional[float] = None) -> Image.Image:
+    if radius is None:
+        return img.filter(ImageFilter.BLUR)
+    return img.filter(ImageFilter.GaussianBlur(radius))
+
+@register_filter("sharpen")
+def sharpen(img: Image.Image, radius: float = 2, percent: int = 150, threshold: int = 3) -> Image.Image:
+    return img.filter(ImageFilter.UnsharpMask(radius=radius, percent=percent, threshold=threshold))
+
+@register_filter("resize")
+def resize(
+    img: Image.Image,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    max_side: Optional[int] = None
+) -> Image.Image:
+    """Resize to width/height (keeping aspect ratio if one is omitted) or fit within max_side."""
+    if max_side is not None:
+        factor = max_side / max(img.size)
+        width, height = round(img.width * factor), round(img.height * factor)
+    elif width is None and height is None:
+        return img
+    elif width is None:
+        width = round(img.width * height / img.height)
+    elif height is None:
+        height = round(img.height * width / img.width)
+    return img.resize((max(1, width), max(1, height)), Image.LANCZOS)
+
+def high_contrast(img: Image.Image) -> Image.Image:
+    return scale(img, 1.5)
+
+
+class FilterPipeline:
+    """
+    Ordered chain of registered filters applied to one decoded image.
+
+    The input is decoded once, every step works on the in-memory image and
+    the result is encoded once:
+
+        png = (FilterPipeline()
+               .add("resize", max_side=1024)
+               .add("sepia")
+               .add("sharpen")
+               .run(image_bytes))
+    """
+
+    def __init__(self, steps: Optional[List[Tuple[str, Dict[str, Any]]]] = None):
+        self.steps: List[Tuple[str, Dict[str, Any]]] = []
+        for name, params in steps or []:
+            self.add(name, **params)
+
+    def add(self, name: str, **params) -> "FilterPipeline":
+        get_filter(name)  # fail early on unknown names
+        self.steps.append((name, params))
+        return self
+
+    def apply(self, image: ImageInput) -> Image.Image:
+        """Run every step and return the resulting PIL image."""
+        img = open_image(image)
+        for name, params in self.steps:
+            img = get_filter(name)(img, **params)
+        return img
+
+    def run(self, image: ImageInput, format: str = "PNG", **save_options) -> bytes:
+        """Run every step and return the result encoded as format."""
+        img = self.apply(image)
+        if format.upper() in ("JPEG", "JPG") and img.mode not in ("L", "RGB"):
+            img = img.convert("RGB")
+        buffer = io.BytesIO()
+        img.save(buffer, format=format, **save_options)
+        return buffer.getvalue()
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+
+# UI filter names mapped onto registered pipeline steps
+FILTER_STEPS = {
+    "Grayscale": ("grayscale", {}),
+    "Sepia": ("sepia", {}),
+    "High Contrast": ("scale", {"factor": 1.5}),
+    "Blur": ("blur", {}),
+}
+
+FILTERS = list(FILTER_STEPS)
+
+def apply_filters(image: ImageInput, filter_types: List[str]) -> Image.Image:
+    """
+    Apply a sequence of named filters to an image, decoding it only once.
+
+    Args:
+        image: Image bytes, path, file-like object or PIL image
+        filter_types: Names from FILTERS, applied in order; unknown names are skipped
+
+    Returns:
+        Filtered PIL image
+    """
+    pipeline = FilterPipeline()
+    for filter_type in filter_types:
+        if filter_type in FILTER_STEPS:
+            name, params = FILTER_STEPS[filter_type]
+            pipeline.add(name, **params)
+    return pipeline.apply(image)
+
+def apply_filter(image: ImageInput, filter_type: str) -> Image.Image:
+    """
+    Apply one of the named filters to an image.
+
+    Args:
+        image: Image bytes, path, file-like object or PIL image
+        filter_type: One of FILTERS; any other value returns the image unchanged
+
+    Returns:
+        Filtered PIL image
+    """
+    return apply_filters(image, [filter_type])
+
+__all__ = [
+    'FILTERS',
+    'FilterPipeline',
+    'apply_filter',
+    'apply_filters',
+    'available_filters',
+    'get_filter',
+    'open_image',
+    'register_filter',
+    'sepia',
+    'high_contrast',
+]
@@ -1,63 +1,144 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import contextvars
 from services import (
     lifestyle_shot_by_text,
     add_shadow,
     create_packshot,
     generate_hd_image
 )
+from services.upload import ImageInput
+
+# A stage is a list of the stage names it consumes plus a function that
+# receives the outputs of all finished stages
+Stage = Tuple[List[str], Callable[[Dict[str, Any]], Any]]
+
+def run_stages(stages: Dict[str, Stage], max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run a set of stages, starting each one as soon as its dependencies finish.
+
+    Independent stages run in parallel, so total latency is that of the
+    slowest dependency chain rather than the sum of all stages. The first
+    stage failure is re-raised once the stages already running finish.
+
+    Args:
+        stages: Mapping of stage name to (dependency names, stage function)
+        max_workers: Maximum number of stages running at once (defaults to one per stage)
+
+    Returns:
+        Dict mapping each stage name to its output
+    """
+    outputs: Dict[str, Any] = {}
+    pending = dict(stages)
+    running = {}
+
+    if not pending:
+        return outputs
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(pending)) as executor:
+        while pending or running:
+            for name, (deps, func) in list(pending.items()):
+                if all(dep in outputs for dep in deps):
+                    # Copy the caller's context so stage calls join its metrics trace
+                    context = contextvars.copy_context()
+                    running[executor.submit(context.run, func, dict(outputs))] = name
+                    del pending[name]
+
+            if not running:
+                raise ValueError(f"Unresolvable stage dependencies: {sorted(pending)}")
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                outputs[running.pop(future)] = future.result()
+
+    return outputs
 
 def generate_ad_set(
     api_key: str,
-    image: Optional[bytes] = None,
+    image: Optional[ImageInput] = None,
     prompt: Optional[str] = None,
     config: Dict[str, Any] = None
 ) -> Dict[str, Any]:
     """
     Generate a set of product ads based on configuration.
+
+    The packshot, shadow and lifestyle stages only depend on the source image,
+    so they run concurrently. When the image has to be generated from the
+    prompt first, they wait on the HD image stage and receive its result URL,
+    which the API fetches directly instead of the image being downloaded and
+    uploaded again.
+
+    Args:
+        api_key: Bria AI API key
+        image: Source image bytes, file path or URL
+        prompt: Text prompt used to generate the source image when no image is given
+        config: Ad-set options
     """
     if not config:
         config = {}
-    
-    result = {}
-    
+
+    stages: Dict[str, Stage] = {}
+    image_deps: List[str] = []
+
     # Generate HD image if prompt provided
     if prompt and not image:
-        hd_response = generate_hd_image(
+        stages["hd_image"] = ([], lambda outputs: generate_hd_image(
             api_key=api_key,
             prompt=prompt,
             num_results=config.get("num_results", 1),
             aspect_ratio=config.get("aspect_ratio", "1:1"),
             sync=config.get("sync", True)
-        )
-        result["hd_image"] = hd_response
-        image = hd_response.get("result_url")
-    
-    # Create packshot if requested
-    if config.get("create_packshot", False) and image:
-        packshot_response = create_packshot(
+        ))
+        image_deps = ["hd_image"]
+
+    def source_image(outputs: Dict[str, Any]):
+        if "hd_image" in outputs:
+            return outputs["hd_image"].url
+        return image
+
+    def packshot_stage(outputs: Dict[str, Any]):
+        source = source_image(outputs)
+        if not source:
+            return None
+        return create_packshot(
             api_key=api_key,
-            image_data=image,
+            image_data=source,
             background_color=config.get("background_color", "#FFFFFF")
         )
-        result["packshot"] = packshot_response
-    
-    # Add shadow if requested
-    if config.get("add_shadow", False) and image:
-        shadow_response = add_shadow(
+
+    def shadow_stage(outputs: Dict[str, Any]):
+        source = source_image(outputs)
+        if not source:
+            return None
+        return add_shadow(
             api_key=api_key,
-            image_data=image,
+            image_data=source,
             shadow_type=config.get("shadow_type", "natural")
         )
-        result["shadow"] = shadow_response
-    
-    # Create lifestyle shot if requested
-    if config.get("lifestyle_shot", False) and image:
-        lifestyle_response = lifestyle_shot_by_text(
+
+    def lifestyle_stage(outputs: Dict[str, Any]):
+        source = source_image(outputs)
+        if not source:
+            return None
+        return lifestyle_shot_by_text(
             api_key=api_key,
-            image_data=image,
+            image_data=source,
             scene_description=config.get("scene_description", ""),
             num_results=config.get("num_results", 1)
         )
-        result["lifestyle"] = lifestyle_response
-    
-    return result 
\ No newline at end of file
+
+    # Create packshot if requested
+    if config.get("create_packshot", False) and (image or image_deps):
+        stages["packshot"] = (image_deps, packshot_stage)
+
+    # Add shadow if requested
+    if config.get("add_shadow", False) and (image or image_deps):
+        stages["shadow"] = (image_deps, shadow_stage)
+
+    # Create lifestyle shot if requested
+    if config.get("lifestyle_shot", False) and (image or image_deps):
+        stages["lifestyle"] = (image_deps, lifestyle_stage)
+
+    outputs = run_stages(stages, max_workers=config.get("max_workers"))
+
+    return {name: outputs[name] for name in stages if outputs[name] is not None}
\ No newline at end of file
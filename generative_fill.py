@@ -1,11 +1,12 @@
-from typing import Dict, Any, Optional
-import requests
-import base64
+from typing import Dict, Any, Optional, Tuple
+from .client import BriaClient, get_client
+from .errors import service_error
+from .results import BriaResult
+from .upload import ImageInput, image_fields, is_url, prepare_image_and_mask, read_image
 
-def generative_fill(
-    api_key: str,
-    image_data: bytes,
-    mask_data: bytes,
+def build_generative_fill_request(
+    image_data: ImageInput,
+    mask_data: ImageInput,
     prompt: str,
     negative_prompt: Optional[str] = None,
     num_results: int = 4,
@@ -13,38 +14,10 @@ def generative_fill(
     seed: Optional[int] = None,
     content_moderation: bool = False,
     mask_type: str = "manual"
-) -> Dict[str, Any]:
-    """
-    Generate content in a masked area of an image using a text prompt.
-    
-    Args:
-        api_key: Bria AI API key
-        image_data: Image data in bytes
-        mask_data: Mask image data in bytes
-        prompt: Description of what to generate in the masked area
-        negative_prompt: Description of what to avoid (optional)
-        num_results: Number of variations to generate (1-4)
-        sync: Whether to wait for results
-        seed: Optional seed for reproducible results
-        content_moderation: Whether to enable content moderation
-        mask_type: Type of mask ('manual' or 'automatic')
-    """
-    url = "https://engine.prod.bria-api.com/v1/gen_fill"
-    
-    headers = {
-        'api_token': api_key,
-        'Accept': 'application/json',
-        'Content-Type': 'application/json'
-    }
-    
-    # Convert image and mask to base64
-    image_base64 = base64.b64encode(image_data).decode('utf-8')
-    mask_base64 = base64.b64encode(mask_data).decode('utf-8')
-    
+) -> Tuple[str, Dict[str, Any]]:
+    """Build the endpoint and payload for a generative fill request."""
     # Prepare request data
     data = {
-        'file': image_base64,
-        'mask_file': mask_base64,
         'mask_type': mask_type,
         'prompt': prompt,
         'num_results': num_results,
@@ -52,23 +25,68 @@ def generative_fill(
         'content_moderation': content_moderation
     }
     
+    if is_url(image_data) or is_url(mask_data):
+        # URLs are passed through; local files are sent untouched so the
+        # image and mask keep matching dimensions
+        data.update(image_fields(image_data, "gen_fill", prepare=False))
+        data.update(image_fields(mask_data, "gen_fill", file_field="mask_file", url_field="mask_url", prepare=False))
+    else:
+        # Shrink the image, keeping the mask aligned with it; the client
+        # base64-encodes file fields while sending
+        data['file'], data['mask_file'] = prepare_image_and_mask(
+            read_image(image_data), read_image(mask_data), "gen_fill"
+        )
+    
     # Add optional parameters
     if negative_prompt:
         data['negative_prompt'] = negative_prompt
     if seed is not None:
         data['seed'] = seed
     
+    return "gen_fill", data
+
+def generative_fill(
+    api_key: str,
+    image_data: ImageInput,
+    mask_data: ImageInput,
+    prompt: str,
+    negative_prompt: Optional[str] = None,
+    num_results: int = 4,
+    sync: bool = False,
+    seed: Optional[int] = None,
+    content_moderation: bool = False,
+    mask_type: str = "manual",
+    client: Optional[BriaClient] = None
+) -> BriaResult:
+    """
+    Generate content in a masked area of an image using a text prompt.
+    
+    Args:
+        api_key: Bria AI API key
+        image_data: Image bytes, file path or URL
+        mask_data: Mask image bytes, file path or URL
+        prompt: Description of what to generate in the masked area
+        negative_prompt: Description of what to avoid (optional)
+        num_results: Number of variations to generate (1-4)
+        sync: Whether to wait for results
+        seed: Optional seed for reproducible results
+        content_moderation: Whether to enable content moderation
+        mask_type: Type of mask ('manual' or 'automatic')
+        client: Optional BriaClient to send the request with (defaults to the shared client)
+    """
+    endpoint, data = build_generative_fill_request(
+        image_data,
+        mask_data,
+        prompt,
+        negative_prompt=negative_prompt,
+        num_results=num_results,
+        sync=sync,
+        seed=seed,
+        content_moderation=content_moderation,
+        mask_type=mask_type
+    )
+    
     try:
-        print(f"Making request to: {url}")
-        print(f"Headers: {headers}")
-        print(f"Data: {data}")
-        
-        response = requests.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        
-        print(f"Response status: {response.status_code}")
-        print(f"Response body: {response.text}")
-        
-        return response.json()
+        return BriaResult((client or get_client()).post(endpoint, api_key, data))
     except Exception as e:
-        raise Exception(f"Generative fill failed: {str(e)}") 
\ No newline at end of file
+        raise service_error("Generative fill failed", e)
\ No newline at end of file
@@ -0,0 +1,117 @@
+from typing import Dict, Optional, Tuple
+from collections import OrderedDict
+import threading
+import time
+import requests
+from .client import get_client
+
+class ImageStore:
+    """
+    Size-bounded local store of downloaded result images keyed by URL.
+
+    Images are fetched once and served from memory afterwards. Entries older
+    than revalidate_after are revalidated with a conditional GET
+    (If-None-Match / If-Modified-Since), so an unchanged image costs a 304
+    instead of a full download.
+
+    Args:
+        max_bytes: Total size of stored images before the least recently used are evicted
+        revalidate_after: Seconds before a stored image is revalidated (None never revalidates)
+        session: Optional requests session (defaults to the shared client's pooled session)
+        timeout: Download timeout in seconds
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        revalidate_after: Optional[float] = 300,
+        session: Optional[requests.Session] = None,
+        timeout: float = 30
+    ):
+        self.max_bytes = max_bytes
+        self.revalidate_after = revalidate_after
+        self.timeout = timeout
+        self._session = session
+        self._entries: "OrderedDict[str, Tuple[bytes, Dict[str, str], float]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        return self._session or get_client().session
+
+    def fetch(self, url: str) -> bytes:
+        """
+        Return the image at url, downloading it only if it is not stored or has changed.
+
+        Raises:
+            requests.HTTPError: If the download fails
+        """
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+
+        if entry is not None:
+            content, validators, fetched_at = entry
+            if self.revalidate_after is None or time.time() - fetched_at < self.revalidate_after:
+                return content
+            if not validators:
+                return content
+
+            headers = {}
+            if 'ETag' in validators:
+                headers['If-None-Match'] = validators['ETag']
+            if 'Last-Modified' in validators:
+                headers['If-Modified-Since'] = validators['Last-Modified']
+
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304:
+                self._put(url, content, validators)
+                return content
+        else:
+            response = self.session.get(url, timeout=self.timeout)
+
+        response.raise_for_status()
+        validators = {
+            name: response.headers[name]
+            for name in ('ETag', 'Last-Modified')
+            if name in response.headers
+        }
+        self._put(url, response.content, validators)
+        return response.content
+
+    def _put(self, url: str, content: bytes, validators: Dict[str, str]):
+        with self._lock:
+            previous = self._entries.pop(url, None)
+            if previous is not None:
+                self._size -= len(previous[0])
+
+            # Images larger than the whole store are returned but not kept
+            if len(content) > self.max_bytes:
+                return
+
+            self._entries[url] = (content, validators, time.time())
+            self._size += len(content)
+            while self._size > self.max_bytes:
+                _, (evicted, _, _) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Total bytes of stored images."""
+        return self._size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+__all__ = ['ImageStore']
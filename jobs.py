@@ -0,0 +1,215 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed as futures_as_completed
+import threading
+from .errors import FatalError, ResultCancelledError, ResultTimeoutError
+from .generative_fill import generative_fill
+from .lifestyle_shot import lifestyle_shot_by_image, lifestyle_shot_by_text
+from .log import get_logger
+from .polling import CANCELLED, TIMED_OUT, PollEvent, ResultPoller
+from .results import BriaResult, to_result
+
+logger = get_logger(__name__)
+
+# Requests are sent from this many threads by default; polling them costs no threads
+DEFAULT_SUBMIT_WORKERS = 16
+
+_poller: Optional[ResultPoller] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_poller() -> ResultPoller:
+    """Return the poller shared by all jobs, creating it on first use."""
+    global _poller
+    with _lock:
+        if _poller is None:
+            _poller = ResultPoller(queue_events=False)  # Jobs are told through callbacks
+        return _poller
+
+
+def set_poller(poller: ResultPoller) -> None:
+    """Replace the shared poller, e.g. with one using a longer deadline."""
+    global _poller
+    with _lock:
+        _poller = poller
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=DEFAULT_SUBMIT_WORKERS, thread_name_prefix="bria-jobs")
+        return _executor
+
+
+class Job:
+    """
+    Handle for an asynchronous Bria request.
+
+    Non-sync endpoints answer with URLs that only start serving the image
+    once it has been generated. A Job is done when every one of its URLs is
+    ready, or as soon as the request or any URL fails. All jobs share one
+    ResultPoller, so thousands of pending jobs cost no threads of their own.
+
+    Args:
+        name: Label for logs and error messages, usually the service name
+        poller: Poller to watch the result URLs with (defaults to the shared poller)
+        deadline: Seconds to wait for each URL (defaults to the poller's deadline)
+    """
+
+    def __init__(self, name: str, poller: Optional[ResultPoller] = None, deadline: Optional[float] = None):
+        self.name = name
+        self.response: Optional[BriaResult] = None
+        self.urls: List[str] = []
+        self._poller = poller
+        self._deadline = deadline
+        self._future: Future = Future()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        state = "done" if self.done() else "pending"
+        return f"<Job {self.name} {state} urls={len(self.urls)}>"
+
+    def done(self) -> bool:
+        """Return whether the job has finished, successfully or not."""
+        return self._future.done()
+
+    def result(self, timeout: Optional[float] = None) -> BriaResult:
+        """
+        Wait for the job and return its response, once all its result URLs are ready.
+
+        Args:
+            timeout: Seconds to wait (None waits until the job finishes)
+
+        Raises:
+            concurrent.futures.TimeoutError: If the job is still pending after timeout
+            BriaError: If the request failed or a URL was not ready before its deadline
+        """
+        return self._future.result(timeout=timeout)
+
+    def exception(self, timeout: Optional[float] = None) -> Optional[BaseException]:
+        """Wait for the job and return its error, or None if it succeeded."""
+        return self._future.exception(timeout=timeout)
+
+    def add_done_callback(self, callback: Callable[["Job"], None]) -> None:
+        """
+        Call callback with this job once it is done (immediately if it already is).
+
+        Callbacks run on the poller or submitting thread, so they should be quick.
+        """
+        self._future.add_done_callback(lambda future: callback(self))
+
+    def start(self, response: Dict[str, Any]) -> None:
+        """Begin watching the result URLs of a request's response."""
+        self.response = to_result(response)
+        self.urls = self.response.urls
+        if not self.urls:
+            self._fail(FatalError(f"{self.name} returned no result URLs: {str(response)[:500]}"))
+            return
+
+        with self._lock:
+            self._pending = len(self.urls)
+        poller = self._poller or get_poller()
+        for url in self.urls:
+            poller.watch(url, deadline=self._deadline, callback=self._on_event)
+
+    def _on_event(self, event: PollEvent) -> None:
+        if event.status == TIMED_OUT:
+            self._fail(ResultTimeoutError(
+                f"{self.name} result not ready after {event.elapsed:.0f}s: {event.url}"
+            ))
+            return
+        if event.status == CANCELLED:
+            self._fail(ResultCancelledError(f"{self.name} result polling was cancelled: {event.url}"))
+            return
+        with self._lock:
+            self._pending -= 1
+            if self._pending == 0 and not self._future.done():
+                self._future.set_result(self.response)
+
+    def _fail(self, error: BaseException) -> None:
+        with self._lock:
+            if self._future.done():
+                return
+            self._future.set_exception(error)
+        logger.warning("Job %s failed: %s", self.name, str(error))
+
+    def _run(self, func: Callable[..., Dict[str, Any]], args: tuple, kwargs: Dict[str, Any]) -> None:
+        try:
+            response = func(*args, **kwargs)
+        except Exception as e:
+            self._fail(e)
+            return
+        self.start(response)
+
+
+def submit(
+    func: Callable[..., Dict[str, Any]],
+    *args,
+    poller: Optional[ResultPoller] = None,
+    deadline: Optional[float] = None,
+    executor: Optional[ThreadPoolExecutor] = None,
+    **kwargs
+) -> Job:
+    """
+    Call a service function in the background and return a Job for its results.
+
+    The request itself is sent from a worker thread, so submit() returns at
+    once; the returned URLs are then polled until they are ready.
+
+        jobs = [submit(generative_fill, api_key, image, mask, prompt) for prompt in prompts]
+        for job in as_completed(jobs):
+            print(job.result().urls)
+
+    Args:
+        func: Service function returning a response with result URLs
+        *args: Positional arguments for func
+        poller: Poller to watch the result URLs with (defaults to the shared poller)
+        deadline: Seconds to wait for each URL (defaults to the poller's deadline)
+        executor: Executor to send the request from (defaults to a shared pool)
+        **kwargs: Keyword arguments for func
+    """
+    job = Job(getattr(func, "__name__", "job"), poller=poller, deadline=deadline)
+    (executor or _get_executor()).submit(job._run, func, args, kwargs)
+    return job
+
+
+def submit_generative_fill(*args, **kwargs) -> Job:
+    """submit() for generative_fill; takes the same arguments."""
+    return submit(generative_fill, *args, **kwargs)
+
+
+def submit_lifestyle_shot_by_text(*args, **kwargs) -> Job:
+    """submit() for lifestyle_shot_by_text; takes the same arguments."""
+    return submit(lifestyle_shot_by_text, *args, **kwargs)
+
+
+def submit_lifestyle_shot_by_image(*args, **kwargs) -> Job:
+    """submit() for lifestyle_shot_by_image; takes the same arguments."""
+    return submit(lifestyle_shot_by_image, *args, **kwargs)
+
+
+def as_completed(jobs: Iterable[Job], timeout: Optional[float] = None) -> Iterator[Job]:
+    """
+    Yield jobs as they finish, whichever finishes first.
+
+    Args:
+        jobs: Jobs to wait for
+        timeout: Total seconds to wait before raising concurrent.futures.TimeoutError
+    """
+    by_future = {job._future: job for job in jobs}
+    for future in futures_as_completed(by_future, timeout=timeout):
+        yield by_future[future]
+
+
+__all__ = [
+    'Job',
+    'as_completed',
+    'get_poller',
+    'set_poller',
+    'submit',
+    'submit_generative_fill',
+    'submit_lifestyle_shot_by_image',
+    'submit_lifestyle_shot_by_text',
+]
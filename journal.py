@@ -0,0 +1,184 @@
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from .cache import cache_key
+
+# Job states, in the order a job moves through them
+SUBMITTED = "submitted"  # The API accepted the request; its result URLs may still be generating
+DONE = "done"  # Every result URL is ready (or the call returned a final value)
+FAILED = "failed"
+
+
+class JournalEntry(NamedTuple):
+    """Latest recorded state of one job."""
+    key: str
+    operation: str
+    input: str
+    status: str
+    urls: List[str]
+    response: Any  # Raw API response, or the call's return value
+    error: Optional[str]
+    elapsed: Optional[float]  # Seconds from the start of the request to this state
+    updated: float
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return "sha256:" + digest.hexdigest()
+
+
+def job_key(operation: str, params: Dict[str, Any]) -> str:
+    """
+    Identify a job by its operation, input content and parameters.
+
+    Local files are hashed by content, so a renamed or moved file still maps
+    to its earlier job and an edited one does not; URLs and prompts are
+    hashed as given.
+    """
+    normalized = {}
+    for name, value in params.items():
+        if isinstance(value, os.PathLike) or (isinstance(value, str) and os.path.isfile(value)):
+            value = _file_digest(os.fspath(value))
+        normalized[name] = value
+    return cache_key(operation, normalized)
+
+
+class JobJournal:
+    """
+    Append-only record of batch jobs in a SQLite database.
+
+    Each state change is appended as a new row and the latest row per key is
+    the job's state, so a crashed run can be resumed: done jobs are skipped
+    and submitted jobs are polled again rather than paid for twice. Rows are
+    committed in batches, at most every flush_interval seconds or
+    batch_size rows, to avoid a disk sync per job; close() (or leaving the
+    context manager) commits the rest. A state recorded with flush=True is
+    committed before record() returns.
+
+    Args:
+        path: Database file path
+        flush_interval: Longest time in seconds a recorded state waits to be committed
+        batch_size: Number of recorded states that forces a commit
+    """
+
+    def __init__(self, path: str = "bria_jobs.sqlite", flush_interval: float = 1.0, batch_size: int = 100):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self._latest: Dict[str, JournalEntry] = {}  # States recorded but not yet committed
+        self._last_flush = time.monotonic()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, operation TEXT NOT NULL, "
+                "input TEXT NOT NULL, status TEXT NOT NULL, urls TEXT NOT NULL, response TEXT, "
+                "error TEXT, elapsed REAL, created REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS events_key ON events (key, id)")
+
+    def record(
+        self,
+        key: str,
+        status: str,
+        operation: str = "",
+        input: str = "",
+        urls: Optional[List[str]] = None,
+        response: Any = None,
+        error: Optional[str] = None,
+        elapsed: Optional[float] = None,
+        flush: bool = False
+    ) -> JournalEntry:
+        """
+        Append a job's new state.
+
+        Args:
+            flush: Commit it right away instead of with the next batch
+        """
+        entry = JournalEntry(key, operation, input, status, list(urls or []), response, error, elapsed, time.time())
+        with self._lock:
+            self._latest[key] = entry
+            self._pending.append((
+                key, operation, input, status, json.dumps(entry.urls),
+                json.dumps(response) if response is not None else None, error, elapsed, entry.updated
+            ))
+            if flush or len(self._pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+        return entry
+
+    def get(self, key: str) -> Optional[JournalEntry]:
+        """Return the latest state of a job, or None if it was never recorded."""
+        with self._lock:
+            if key in self._latest:
+                return self._latest[key]
+            row = self._conn.execute(
+                "SELECT key, operation, input, status, urls, response, error, elapsed, created "
+                "FROM events WHERE key = ? ORDER BY id DESC LIMIT 1", (key,)
+            ).fetchone()
+        return self._entry(row) if row is not None else None
+
+    def entries(self, status: Optional[str] = None) -> Iterator[JournalEntry]:
+        """Yield the latest state of every job, optionally only those in one status."""
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, operation, input, status, urls, response, error, elapsed, created FROM events "
+                "WHERE id IN (SELECT MAX(id) FROM events GROUP BY key) ORDER BY id"
+            ).fetchall()
+        for row in rows:
+            if status is None or row[3] == status:
+                yield self._entry(row)
+
+    def stats(self) -> Dict[str, int]:
+        """Number of jobs in each status."""
+        counts: Dict[str, int] = {}
+        for entry in self.entries():
+            counts[entry.status] = counts.get(entry.status, 0) + 1
+        return counts
+
+    @staticmethod
+    def _entry(row: tuple) -> JournalEntry:
+        key, operation, input, status, urls, response, error, elapsed, created = row
+        return JournalEntry(
+            key, operation, input, status, json.loads(urls),
+            json.loads(response) if response is not None else None, error, elapsed, created
+        )
+
+    def _flush_locked(self) -> None:
+        if self._pending:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO events (key, operation, input, status, urls, response, error, elapsed, created) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", self._pending
+                )
+            self._pending = []
+            self._latest.clear()
+        self._last_flush = time.monotonic()
+
+    def flush(self) -> None:
+        """Commit every recorded state."""
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+    def __enter__(self) -> "JobJournal":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+__all__ = ['DONE', 'FAILED', 'SUBMITTED', 'JobJournal', 'JournalEntry', 'job_key']
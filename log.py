@@ -0,0 +1,104 @@
+from typing import Any, Dict, Mapping, Optional
+import json
+import logging
+import os
+
+# Payload and header names whose values are never written to logs
+SECRET_FIELDS = ("api_token", "api_key", "authorization", "x-api-key")
+
+# Longest string value kept in logged payloads and response bodies
+MAX_VALUE_LENGTH = 200
+
+# LogRecord attributes that are not structured fields passed through extra=
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+# Stay silent unless the application configures logging
+logging.getLogger("services").addHandler(logging.NullHandler())
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Return a logger under the 'services' hierarchy for a module name."""
+    if name != "services" and not name.startswith("services."):
+        name = "services." + name.rsplit(".", 1)[-1]
+    return logging.getLogger(name)
+
+
+def truncate(value: str, max_length: int = MAX_VALUE_LENGTH) -> str:
+    """Shorten long strings, noting how much was cut."""
+    if len(value) <= max_length:
+        return value
+    return f"{value[:max_length]}...(+{len(value) - max_length} chars)"
+
+
+def redact(data: Any, max_length: int = MAX_VALUE_LENGTH) -> Any:
+    """
+    Return a copy of a payload that is safe and cheap to log.
+
+    File fields (bytes) become a size marker, secrets are masked and long
+    strings are truncated. Nested dicts and lists are handled recursively.
+
+    Args:
+        data: Request payload, headers or response
+        max_length: Longest string value kept
+    """
+    if isinstance(data, Mapping):
+        return {
+            key: "***" if str(key).lower() in SECRET_FIELDS else redact(value, max_length)
+            for key, value in data.items()
+        }
+    if isinstance(data, (list, tuple)):
+        return [redact(value, max_length) for value in data]
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return f"<{len(data)} bytes>"
+    if isinstance(data, str):
+        return truncate(data, max_length)
+    return data
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including fields passed with extra=."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level: Optional[str] = None, json_format: bool = False) -> logging.Logger:
+    """
+    Send the services loggers to stderr.
+
+    The package only creates loggers; applications call this (or configure
+    logging themselves) to see the output.
+
+    Args:
+        level: Level name such as "INFO" or "DEBUG" (defaults to BRIA_LOG_LEVEL or WARNING)
+        json_format: Write JSON lines instead of plain text
+    """
+    logger = logging.getLogger("services")
+    logger.setLevel((level or os.getenv("BRIA_LOG_LEVEL") or "WARNING").upper())
+
+    handler = logging.StreamHandler()
+    if json_format:
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    for existing in list(logger.handlers):
+        if getattr(existing, "_services_handler", False):
+            logger.removeHandler(existing)
+    handler._services_handler = True
+    logger.addHandler(handler)
+    return logger
+
+
+__all__ = ['get_logger', 'redact', 'truncate', 'configure_logging', 'JSONFormatter']
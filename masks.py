@@ -0,0 +1,203 @@
+from typing import NamedTuple, Optional, Tuple
+import io
+import numpy as np
+from PIL import Image
+
+# (left, top, right, bottom) in pixels, right and bottom exclusive like PIL boxes
+Box = Tuple[int, int, int, int]
+
+
+class Mask(NamedTuple):
+    """An encoded mask ready for upload."""
+    data: bytes  # PNG, 1-bit unless a soft mask was requested
+    size: Tuple[int, int]
+    bbox: Optional[Box]  # Tight box around the masked area, None if nothing is masked
+    coverage: float  # Share of pixels masked
+
+
+def binarize(image_data: np.ndarray, threshold: int = 128) -> np.ndarray:
+    """
+    Turn a drawn mask into a boolean array.
+
+    RGBA input (such as canvas strokes on a transparent background) is
+    thresholded on its alpha channel, so the brush color does not matter;
+    RGB and grayscale input are thresholded on luminance.
+
+    Args:
+        image_data: HxW, HxWx3 or HxWx4 array
+        threshold: Values at or above this (0-255) are masked
+    """
+    data = np.asarray(image_data)
+    if data.ndim == 3 and data.shape[2] == 4:
+        values = data[..., 3]
+    elif data.ndim == 3:
+        values = data[..., :3] @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    else:
+        values = data
+    return values >= threshold
+
+
+def _window_sum(values: np.ndarray, radius: int, axis: int) -> np.ndarray:
+    # Sum over [i - radius, i + radius] along axis in O(n) using a cumulative sum
+    pad = [(0, 0)] * values.ndim
+    pad[axis] = (radius + 1, radius)
+    totals = np.cumsum(np.pad(values, pad), axis=axis, dtype=np.float32 if values.dtype.kind == 'f' else np.int32)
+    n = values.shape[axis]
+    upper = np.take(totals, np.arange(2 * radius + 1, n + 2 * radius + 1), axis=axis)
+    lower = np.take(totals, np.arange(0, n), axis=axis)
+    return upper - lower
+
+
+def dilate(mask: np.ndarray, radius: int) -> np.ndarray:
+    """Grow a boolean mask by radius pixels in every direction (square structuring element)."""
+    if radius <= 0:
+        return mask
+    grown = _window_sum(mask.astype(np.int32), radius, axis=0) > 0
+    return _window_sum(grown.astype(np.int32), radius, axis=1) > 0
+
+
+def feather(mask: np.ndarray, radius: int, passes: int = 3) -> np.ndarray:
+    """
+    Soften a mask's edges, returning float32 values in [0, 1].
+
+    Repeated box blurs approximate a Gaussian with a spread of about radius pixels.
+    """
+    soft = mask.astype(np.float32)
+    if radius <= 0:
+        return soft
+    width = 2 * radius + 1
+    for _ in range(passes):
+        soft = _window_sum(soft, radius, axis=0) / width
+        soft = _window_sum(soft, radius, axis=1) / width
+    return np.clip(soft, 0.0, 1.0)
+
+
+def bounding_box(mask: np.ndarray) -> Optional[Box]:
+    """Return the tight (left, top, right, bottom) box around the nonzero pixels, or None."""
+    rows = np.flatnonzero(mask.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+def _rescale_region(values: np.ndarray, size: Tuple[int, int]) -> Tuple[Optional[np.ndarray], Tuple[int, int]]:
+    # Bilinearly resize only the output pixels that blend in a nonzero source
+    # pixel (the source bbox plus the one-pixel reach of the interpolation);
+    # everything outside is zero. Returns that block and its (left, top) offset,
+    # or None if the whole output is zero.
+    box = bounding_box(values)
+    if box is None:
+        return None, (0, 0)
+    width, height = size
+
+    def coordinates(out: int, src: int, start: int, stop: int):
+        # Pixel centers of the output mapped into the source
+        position = np.clip((np.arange(out, dtype=np.float32) + 0.5) * (src / out) - 0.5, 0, src - 1)
+        low = np.floor(position).astype(np.intp)
+        high = np.minimum(low + 1, src - 1)
+        hit = np.flatnonzero((high >= start) & (low < stop))
+        if hit.size == 0:
+            return None
+        first, last = int(hit[0]), int(hit[-1]) + 1
+        return first, low[first:last], high[first:last], (position - low)[first:last]
+
+    left, top, right, bottom = box
+    rows_at = coordinates(height, values.shape[0], top, bottom)
+    cols_at = coordinates(width, values.shape[1], left, right)
+    if rows_at is None or cols_at is None:
+        return None, (0, 0)
+    y, y0, y1, wy = rows_at
+    x, x0, x1, wx = cols_at
+    values = values.astype(np.float32)
+    rows = values[y0] * (1 - wy)[:, None] + values[y1] * wy[:, None]
+    return rows[:, x0] * (1 - wx) + rows[:, x1] * wx, (x, y)
+
+
+def rescale(mask: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    """
+    Resize a mask to size (width, height) with bilinear interpolation.
+
+    Returns float32 values in [0, 1]; boolean input is treated as 0/1.
+    Only the area around the masked pixels is interpolated.
+    """
+    width, height = size
+    if (height, width) == mask.shape:
+        return mask.astype(np.float32)
+    scaled = np.zeros((height, width), dtype=np.float32)
+    block, (left, top) = _rescale_region(mask, size)
+    if block is not None:
+        scaled[top:top + block.shape[0], left:left + block.shape[1]] = block
+    return scaled
+
+
+def encode_mask(mask: np.ndarray, soft: bool = False) -> bytes:
+    """
+    Encode a mask as PNG.
+
+    Boolean masks (or soft=False) are written as 1-bit PNGs, which compress
+    to a few kilobytes even at full resolution; soft masks as 8-bit grayscale,
+    from floats in [0, 1] or uint8 values used as is.
+    """
+    if soft and mask.dtype == np.uint8:
+        img = Image.fromarray(mask, mode='L')
+    elif soft and mask.dtype != np.bool_:
+        img = Image.fromarray(np.round(np.clip(mask, 0, 1) * 255).astype(np.uint8), mode='L')
+    else:
+        img = Image.fromarray(mask >= 0.5 if mask.dtype != np.bool_ else mask).convert('1')
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def mask_from_canvas(
+    image_data: np.ndarray,
+    size: Optional[Tuple[int, int]] = None,
+    grow: int = 0,
+    feather_radius: int = 0,
+    threshold: int = 128,
+    soft: bool = False
+) -> Mask:
+    """
+    Turn strokes drawn on a (downscaled) canvas into an upload-ready mask for the original image.
+
+    The strokes are binarized, grown and feathered at canvas resolution, then
+    rescaled to the original image size. Feathering smooths the stroke edges
+    before the rescale, so the full-resolution 1-bit mask has clean outlines
+    rather than enlarged canvas pixels. Only the region around the strokes is
+    interpolated, into a one-byte-per-pixel canvas, so large originals do not
+    need full-size float buffers.
+
+    Args:
+        image_data: Canvas pixels (HxWx4 RGBA, or a grayscale/RGB mask)
+        size: (width, height) of the original image (defaults to the canvas size)
+        grow: Pixels, at canvas resolution, to dilate the strokes by
+        feather_radius: Pixels, at canvas resolution, to soften the edges over
+        threshold: Alpha or luminance (0-255) at which a canvas pixel counts as drawn
+        soft: Upload the feathered edges as an 8-bit mask instead of a 1-bit one
+    """
+    mask = dilate(binarize(image_data, threshold), grow)
+    values = feather(mask, feather_radius) if feather_radius > 0 else mask
+    if size is None:
+        size = (mask.shape[1], mask.shape[0])
+    width, height = size
+    final = np.zeros((height, width), dtype=np.uint8 if soft else np.bool_)
+    bbox = None
+    masked = 0
+    block, (left, top) = _rescale_region(values, size)
+    if block is not None:
+        block = np.round(np.clip(block, 0, 1) * 255).astype(np.uint8) if soft else block >= 0.5
+        final[top:top + block.shape[0], left:left + block.shape[1]] = block
+        box = bounding_box(block)
+        if box is not None:
+            bbox = (box[0] + left, box[1] + top, box[2] + left, box[3] + top)
+        masked = np.count_nonzero(block)
+    return Mask(
+        data=encode_mask(final, soft=soft),
+        size=size,
+        bbox=bbox,
+        coverage=float(masked) / final.size if final.size else 0.0
+    )
+
+
+__all__ = ['Mask', 'binarize', 'bounding_box', 'dilate', 'encode_mask', 'feather', 'mask_from_canvas', 'rescale']
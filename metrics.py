@@ -0,0 +1,232 @@
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+from collections import deque
+from contextlib import contextmanager
+import contextvars
+import json
+import math
+import threading
+import time
+
+# Quantiles reported per endpoint
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+class CallRecord(NamedTuple):
+    """Measurements for one Bria API call, including its retries."""
+    endpoint: str
+    status: Optional[int]  # HTTP status of the last attempt (None if no response arrived)
+    error: Optional[str]  # Error class name if the call failed
+    encode_time: float  # Seconds spent base64-encoding the request body
+    upload_bytes: int  # Request body size
+    ttfb: Optional[float]  # Seconds from sending to the response headers
+    latency: float  # Seconds for the whole call, including backoff and rate-limit waits
+    response_bytes: int
+    retries: int
+
+
+class Span:
+    """A traced block of code and the API calls made inside it."""
+
+    def __init__(self, name: str, attributes: Dict[str, Any], parent: Optional["Span"] = None):
+        self.name = name
+        self.attributes = attributes
+        self.parent = parent
+        self.calls: List[CallRecord] = []
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+
+    def add(self, record: CallRecord) -> None:
+        span = self
+        while span is not None:
+            span.calls.append(record)
+            span = span.parent
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "attributes": self.attributes,
+            "duration": self.duration,
+            "calls": [record._asdict() for record in self.calls],
+        }
+
+
+_current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("bria_span", default=None)
+
+
+def _quantile(values: List[float], q: float) -> float:
+    # Nearest-rank quantile of an already sorted list
+    return values[min(len(values), max(1, math.ceil(q * len(values)))) - 1]
+
+
+class _EndpointStats:
+    def __init__(self, max_samples: int):
+        self.count = 0
+        self.statuses: Dict[str, int] = {}
+        self.retries = 0
+        self.upload_bytes = 0
+        self.response_bytes = 0
+        self.encode_time = 0.0
+        self.latency_sum = 0.0
+        self.latencies: deque = deque(maxlen=max_samples)
+        self.ttfbs: deque = deque(maxlen=max_samples)
+
+
+class MetricsRegistry:
+    """
+    Aggregates CallRecords per endpoint and exports them.
+
+    Counters cover every call; latency and time-to-first-byte quantiles are
+    computed over the most recent max_samples calls per endpoint. Listeners
+    receive each record as it is added, e.g. to forward it elsewhere.
+
+    Args:
+        max_samples: Calls per endpoint kept for quantiles
+    """
+
+    def __init__(self, max_samples: int = 2048):
+        self.max_samples = max_samples
+        self._endpoints: Dict[str, _EndpointStats] = {}
+        self._listeners: List[Callable[[CallRecord], None]] = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[CallRecord], None]) -> None:
+        self._listeners.append(listener)
+
+    def record(self, record: CallRecord) -> None:
+        with self._lock:
+            stats = self._endpoints.get(record.endpoint)
+            if stats is None:
+                stats = self._endpoints[record.endpoint] = _EndpointStats(self.max_samples)
+            stats.count += 1
+            status = str(record.status) if record.status is not None else "error"
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.retries += record.retries
+            stats.upload_bytes += record.upload_bytes
+            stats.response_bytes += record.response_bytes
+            stats.encode_time += record.encode_time
+            stats.latency_sum += record.latency
+            stats.latencies.append(record.latency)
+            if record.ttfb is not None:
+                stats.ttfbs.append(record.ttfb)
+
+        span = _current_span.get()
+        if span is not None:
+            span.add(record)
+        for listener in self._listeners:
+            listener(record)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-endpoint counters and latency/TTFB quantiles in seconds."""
+        with self._lock:
+            snapshot = {
+                endpoint: (stats, sorted(stats.latencies), sorted(stats.ttfbs))
+                for endpoint, stats in self._endpoints.items()
+            }
+
+        summary = {}
+        for endpoint, (stats, latencies, ttfbs) in snapshot.items():
+            summary[endpoint] = {
+                "count": stats.count,
+                "statuses": dict(stats.statuses),
+                "retries": stats.retries,
+                "upload_bytes": stats.upload_bytes,
+                "response_bytes": stats.response_bytes,
+                "encode_time": stats.encode_time,
+                "latency_mean": stats.latency_sum / stats.count,
+                "latency": {f"p{round(q * 100)}": _quantile(latencies, q) for q in QUANTILES} if latencies else {},
+                "ttfb": {f"p{round(q * 100)}": _quantile(ttfbs, q) for q in QUANTILES} if ttfbs else {},
+            }
+        return summary
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.summary(), **kwargs)
+
+    def to_prometheus(self, prefix: str = "bria") -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        summary = self.summary()
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, samples: Iterator[tuple]):
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{label}="{label_value}"' for label, label_value in labels.items())
+                lines.append(f"{prefix}_{name}{suffix}{{{label_text}}} {value}")
+
+        metric("requests_total", "counter", (
+            ("", {"endpoint": endpoint, "status": status}, count)
+            for endpoint, stats in summary.items() for status, count in stats["statuses"].items()
+        ))
+        for name, field in (
+            ("retries_total", "retries"),
+            ("upload_bytes_total", "upload_bytes"),
+            ("response_bytes_total", "response_bytes"),
+            ("encode_seconds_total", "encode_time"),
+        ):
+            metric(name, "counter", (("", {"endpoint": endpoint}, stats[field]) for endpoint, stats in summary.items()))
+
+        for name, field in (("request_latency_seconds", "latency"), ("ttfb_seconds", "ttfb")):
+            samples = []
+            for endpoint, stats in summary.items():
+                for key, value in stats[field].items():
+                    samples.append(("", {"endpoint": endpoint, "quantile": int(key[1:]) / 100}, value))
+                if field == "latency":
+                    samples.append(("_sum", {"endpoint": endpoint}, stats["latency_mean"] * stats["count"]))
+                    samples.append(("_count", {"endpoint": endpoint}, stats["count"]))
+            metric(name, "summary", iter(samples))
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+
+_default_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the registry the clients record into by default."""
+    return _default_registry
+
+
+def set_metrics(registry: MetricsRegistry) -> None:
+    """Replace the default registry."""
+    global _default_registry
+    _default_registry = registry
+
+
+@contextmanager
+def trace(name: str, **attributes) -> Iterator[Span]:
+    """
+    Collect the API calls made inside a block:
+
+        with trace("ad_set", sku=sku) as span:
+            generate_ad_set(api_key, image, config=config)
+        print(span.duration, [call.latency for call in span.calls])
+
+    Spans nest, and calls are added to every enclosing span. The current span
+    follows asyncio tasks and is copied into the stage threads started by
+    generate_ad_set.
+    """
+    span = Span(name, attributes, parent=_current_span.get())
+    token = _current_span.set(span)
+    try:
+        yield span
+    finally:
+        span.duration = time.perf_counter() - span.start
+        _current_span.reset(token)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+__all__ = [
+    'CallRecord',
+    'MetricsRegistry',
+    'Span',
+    'current_span',
+    'get_metrics',
+    'set_metrics',
+    'trace',
+]
@@ -1,63 +1,67 @@
-from typing import Dict, Any
-import requests
-import base64
+from typing import Dict, Any, Optional, Tuple
+from .client import BriaClient, get_client
+from .errors import service_error
+from .results import BriaResult
+from .upload import ImageInput, image_fields
+
+def build_packshot_request(
+    image_data: ImageInput,
+    background_color: str = "#FFFFFF",
+    sku: str = None,
+    force_rmbg: bool = False,
+    content_moderation: bool = False
+) -> Tuple[str, Dict[str, Any]]:
+    """Build the endpoint and payload for a packshot request."""
+    # Prepare request data
+    data = {
+        'background_color': background_color,
+        'force_rmbg': force_rmbg,
+        'content_moderation': content_moderation
+    }
+    
+    # URLs are passed through; local images are shrunk, re-encoded and
+    # base64-encoded by the client while sending
+    data.update(image_fields(image_data, "product/packshot"))
+    
+    # Add optional SKU if provided
+    if sku:
+        data['sku'] = sku
+    
+    return "product/packshot", data
 
 def create_packshot(
     api_key: str,
-    image_data: bytes,
+    image_data: ImageInput,
     background_color: str = "#FFFFFF",
     sku: str = None,
     force_rmbg: bool = False,
-    content_moderation: bool = False
-) -> Dict[str, Any]:
+    content_moderation: bool = False,
+    client: Optional[BriaClient] = None
+) -> BriaResult:
     """
     Create a professional packshot from a product image.
     
     Args:
         api_key: Bria AI API key
-        image_data: Image data in bytes
+        image_data: Image bytes, file path or URL
         background_color: Background color in hex format or 'transparent'
         sku: Optional SKU identifier for the product
         force_rmbg: Whether to force background removal even if alpha channel exists
         content_moderation: Whether to enable content moderation
+        client: Optional BriaClient to send the request with (defaults to the shared client)
     
     Returns:
-        Dict containing the API response
+        BriaResult with the result URLs (also the API response dict)
     """
-    url = "https://engine.prod.bria-api.com/v1/product/packshot"
-    
-    headers = {
-        'api_token': api_key,
-        'Accept': 'application/json',
-        'Content-Type': 'application/json'
-    }
-    
-    # Convert image data to base64
-    image_base64 = base64.b64encode(image_data).decode('utf-8')
-    
-    # Prepare request data
-    data = {
-        'file': image_base64,
-        'background_color': background_color,
-        'force_rmbg': force_rmbg,
-        'content_moderation': content_moderation
-    }
-    
-    # Add optional SKU if provided
-    if sku:
-        data['sku'] = sku
+    endpoint, data = build_packshot_request(
+        image_data,
+        background_color=background_color,
+        sku=sku,
+        force_rmbg=force_rmbg,
+        content_moderation=content_moderation
+    )
     
     try:
-        print(f"Making request to: {url}")
-        print(f"Headers: {headers}")
-        print(f"Data keys: {list(data.keys())}")
-        
-        response = requests.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        
-        print(f"Response status: {response.status_code}")
-        print(f"Response body: {response.text}")
-        
-        return response.json()
+        return BriaResult((client or get_client()).post(endpoint, api_key, data))
     except Exception as e:
-        raise Exception(f"Packshot creation failed: {str(e)}") 
\ No newline at end of file
+        raise service_error("Packshot creation failed", e)
\ No newline at end of file
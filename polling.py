@@ -0,0 +1,220 @@
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+import asyncio
+import queue
+import random
+import threading
+import time
+import aiohttp
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+READY = "ready"
+TIMED_OUT = "timed_out"
+CANCELLED = "cancelled"  # The poller was closed first
+
+
+class PollEvent(NamedTuple):
+    """Completion of one watched URL."""
+    url: str
+    status: str  # READY, TIMED_OUT or CANCELLED
+    elapsed: float
+    attempts: int
+
+
+def drain_events(events: "queue.Queue[PollEvent]", timeout: Optional[float] = 0) -> List[PollEvent]:
+    """
+    Return every event on a queue, waiting up to timeout seconds for the first one.
+
+    Args:
+        events: Queue the events are put on, e.g. by a watch() callback
+        timeout: Seconds to wait if no event is available yet (0 returns
+            immediately, None waits until one is)
+    """
+    drained = []
+    try:
+        drained.append(events.get(block=timeout != 0, timeout=timeout))
+    except queue.Empty:
+        return drained
+    while True:
+        try:
+            drained.append(events.get_nowait())
+        except queue.Empty:
+            return drained
+
+
+class ResultPoller:
+    """
+    Background poller for result URLs that are still being generated.
+
+    Every watched URL is checked concurrently on a private asyncio loop running
+    in a daemon thread, so callers never block between checks. Each URL backs
+    off exponentially with jitter until it answers 200 to a HEAD request or its
+    deadline passes, and then a PollEvent is put on the events queue and
+    passed to the URL's callbacks. A poller shared by many consumers (jobs,
+    app sessions) should route events through callbacks and turn off
+    queue_events, since nothing would drain the shared queue.
+
+    Args:
+        initial_delay: Seconds before the first re-check of a URL
+        max_delay: Upper bound on the delay between checks
+        deadline: Default seconds after which a URL is reported as timed out
+        max_concurrency: Maximum number of HEAD requests in flight at once
+        request_timeout: Timeout in seconds for a single HEAD request
+        queue_events: Also put every event on the events queue
+    """
+
+    def __init__(
+        self,
+        initial_delay: float = 1.0,
+        max_delay: float = 15.0,
+        deadline: float = 300.0,
+        max_concurrency: int = 32,
+        request_timeout: float = 10.0,
+        queue_events: bool = True
+    ):
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.max_concurrency = max_concurrency
+        self.request_timeout = request_timeout
+        self.queue_events = queue_events
+        self.events: "queue.Queue[PollEvent]" = queue.Queue()
+
+        # url -> callbacks to run when it completes
+        self._watched: Dict[str, List[Callable[[PollEvent], None]]] = {}
+        self._started: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="result-poller", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def watch(
+        self,
+        url: str,
+        deadline: Optional[float] = None,
+        callback: Optional[Callable[[PollEvent], None]] = None
+    ) -> bool:
+        """
+        Start polling a URL. Returns False if the URL is already being watched,
+        in which case the callback is still called when that polling completes.
+
+        Args:
+            url: Result URL to poll
+            deadline: Seconds before giving up (defaults to the poller's deadline)
+            callback: Called from the poller thread with the PollEvent on completion
+        """
+        with self._lock:
+            if url in self._watched:
+                if callback is not None:
+                    self._watched[url].append(callback)
+                return False
+            self._watched[url] = [callback] if callback is not None else []
+            self._started[url] = time.monotonic()
+
+        loop = self._ensure_loop()
+        asyncio.run_coroutine_threadsafe(
+            self._poll(url, self.deadline if deadline is None else deadline), loop
+        )
+        return True
+
+    def watch_many(
+        self,
+        urls: Iterable[str],
+        deadline: Optional[float] = None,
+        callback: Optional[Callable[[PollEvent], None]] = None
+    ) -> None:
+        for url in urls:
+            self.watch(url, deadline=deadline, callback=callback)
+
+    def pending(self) -> List[str]:
+        """URLs still being polled."""
+        with self._lock:
+            return list(self._watched)
+
+    def get_events(self, timeout: Optional[float] = 0) -> List[PollEvent]:
+        """
+        Return completed events, waiting up to timeout seconds for the first one.
+
+        Args:
+            timeout: Seconds to wait if no event is available yet (0 returns
+                immediately, None waits until one is)
+        """
+        return drain_events(self.events, timeout)
+
+    async def _check(self, url: str) -> bool:
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            async with self._semaphore:
+                async with self._session.head(url, allow_redirects=True) as response:
+                    return response.status == 200
+        except Exception:
+            return False
+
+    async def _poll(self, url: str, deadline: float):
+        start = time.monotonic()
+        delay = self.initial_delay
+        attempts = 0
+
+        while True:
+            attempts += 1
+            if await self._check(url):
+                status = READY
+                break
+
+            remaining = deadline - (time.monotonic() - start)
+            if remaining <= 0:
+                status = TIMED_OUT
+                break
+
+            # Jitter keeps many URLs submitted together from re-checking in lockstep
+            await asyncio.sleep(min(remaining, random.uniform(delay / 2, delay)))
+            delay = min(delay * 2, self.max_delay)
+
+        with self._lock:
+            if url not in self._watched:
+                return  # Already reported as cancelled by close()
+            callbacks = self._watched.pop(url)
+            self._started.pop(url, None)
+        self._complete(PollEvent(url, status, time.monotonic() - start, attempts), callbacks)
+
+    def _complete(self, event: PollEvent, callbacks: List[Callable[[PollEvent], None]]) -> None:
+        if self.queue_events:
+            self.events.put(event)
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.exception("Poll callback failed for %s: %s", event.url, str(e))
+
+    def close(self):
+        """Stop the background loop. URLs still being watched complete as CANCELLED, so nobody waits on them."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+            watched, self._watched = self._watched, {}
+            started, self._started = self._started, {}
+        now = time.monotonic()
+        for url, callbacks in watched.items():
+            self._complete(PollEvent(url, CANCELLED, now - started.get(url, now), 0), callbacks)
+        if loop is None:
+            return
+        if self._session is not None:
+            asyncio.run_coroutine_threadsafe(self._session.close(), loop).result(timeout=5)
+            self._session = None
+        loop.call_soon_threadsafe(loop.stop)
+
+
+__all__ = ['ResultPoller', 'PollEvent', 'READY', 'TIMED_OUT', 'CANCELLED', 'drain_events']
@@ -1,48 +1,341 @@
-from typing import Dict, Any, Optional
-import requests
-import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import heapq
+import itertools
+import threading
+import time
+from .cache import CacheBackend, MemoryCache, cache_key
+from .client import BriaClient, get_client
+from .errors import service_error
+from .log import get_logger
+
+logger = get_logger(__name__)
+
+# Enhancements are reused until evicted; use set_prompt_cache(SQLiteCache(...)) to keep them across restarts
+_prompt_cache: Optional[CacheBackend] = MemoryCache(ttl=None, max_entries=4096)
+
+def get_prompt_cache() -> Optional[CacheBackend]:
+    """Return the cache of enhanced prompts, or None if disabled."""
+    return _prompt_cache
+
+def set_prompt_cache(cache: Optional[CacheBackend]) -> None:
+    """Replace the prompt cache; pass None to call the API for every prompt."""
+    global _prompt_cache
+    _prompt_cache = cache
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace and fold case so near-identical prompts share a cache entry."""
+    return " ".join(prompt.split()).casefold()
+
+def prompt_cache_key(prompt: str, **kwargs) -> str:
+    """Cache key for a prompt and the extra API parameters it is enhanced with."""
+    return cache_key("prompt_enhancer", {**kwargs, 'prompt': normalize_prompt(prompt)})
+
+def cached_enhancement(prompt: str, **kwargs) -> Tuple[Optional[str], Optional[str]]:
+    """Return the cache key for a prompt (None if caching is off) and any cached enhancement."""
+    cache = get_prompt_cache()
+    if cache is None:
+        return None, None
+    key = prompt_cache_key(prompt, **kwargs)
+    cached = cache.get(key)
+    return key, cached["prompt"] if cached is not None else None
+
+def store_enhancement(key: Optional[str], result: Dict[str, Any]) -> None:
+    """Cache a successful enhancement response under key."""
+    cache = get_prompt_cache()
+    if key is not None and cache is not None and "prompt variations" in result:
+        cache.set(key, {'prompt': result["prompt variations"]})
+
+def build_prompt_enhancement_request(prompt: str, **kwargs) -> Tuple[str, Dict[str, Any]]:
+    """Build the endpoint and payload for a prompt enhancement request."""
+    data = {
+        'prompt': prompt,
+        **kwargs
+    }
+    return "prompt_enhancer", data
+
+def request_prompt_enhancement(
+    api_key: str,
+    prompt: str,
+    client: Optional[BriaClient] = None,
+    **kwargs
+) -> str:
+    """
+    Enhance a prompt, raising instead of falling back to the original prompt.
+
+    Uses the same cache as enhance_prompt.
+
+    Args:
+        api_key: Bria AI API key
+        prompt: Original prompt to enhance
+        client: Optional BriaClient to send the request with (defaults to the shared client)
+        **kwargs: Additional parameters for the API
+
+    Returns:
+        Enhanced prompt string
+
+    Raises:
+        BriaError: If the request fails or the response has no enhanced prompt
+    """
+    key, cached = cached_enhancement(prompt, **kwargs)
+    if cached is not None:
+        return cached
+
+    endpoint, data = build_prompt_enhancement_request(prompt, **kwargs)
+
+    try:
+        result = (client or get_client()).post(endpoint, api_key, data)
+        enhanced = result["prompt variations"]
+    except Exception as e:
+        raise service_error("Prompt enhancement failed", e)
+
+    store_enhancement(key, result)
+    return enhanced
 
 def enhance_prompt(
     api_key: str,
     prompt: str,
+    client: Optional[BriaClient] = None,
     **kwargs
 ) -> str:
     """
     Enhance a prompt using Bria AI's prompt enhancement service.
-    
+
+    Enhancements are cached by normalized prompt, so resubmitting a prompt
+    that only differs in case or spacing does not call the API again.
+
     Args:
         api_key: Bria AI API key
         prompt: Original prompt to enhance
+        client: Optional BriaClient to send the request with (defaults to the shared client)
         **kwargs: Additional parameters for the API
-    
+
     Returns:
-        Enhanced prompt string
+        Enhanced prompt string, or the original prompt if enhancement fails
     """
-    url = "https://engine.prod.bria-api.com/v1/prompt_enhancer"
-    
-    headers = {
-        'api_token': api_key,
-        'Accept': 'application/json',
-        'Content-Type': 'application/json'
-    }
-    
-    data = {
-        'prompt': prompt,
-        **kwargs
-    }
-    
     try:
-        print(f"Making request to: {url}")
-        print(f"Headers: {headers}")
-        
-        response = requests.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        
-        print(f"Response status: {response.status_code}")
-        print(f"Response body: {response.text}")
-        
-        result = response.json()
-        return result.get("prompt variations", prompt)  # Return original prompt if enhancement fails
+        return request_prompt_enhancement(api_key, prompt, client=client, **kwargs)
     except Exception as e:
-        print(f"Error enhancing prompt: {str(e)}")
-        return prompt  # Return original prompt on error 
\ No newline at end of file
+        logger.warning("Error enhancing prompt: %s", str(e))
+        return prompt  # Return original prompt on error
+
+def enhance_prompts(
+    api_key: str,
+    prompts: List[str],
+    max_workers: int = 8,
+    client: Optional[BriaClient] = None,
+    **kwargs
+) -> List[str]:
+    """
+    Enhance a list of prompts concurrently.
+
+    Prompts are deduplicated by their normalized form first, so each distinct
+    prompt costs at most one API call, and cached prompts cost none.
+
+    Args:
+        api_key: Bria AI API key
+        prompts: Prompts to enhance
+        max_workers: Maximum number of requests in flight at once
+        client: Optional BriaClient to send the requests with (defaults to the shared client)
+        **kwargs: Additional parameters for the API
+
+    Returns:
+        Enhanced prompts in the same order as prompts
+    """
+    unique: Dict[str, str] = {}
+    for prompt in prompts:
+        unique.setdefault(normalize_prompt(prompt), prompt)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(unique) or 1))) as executor:
+        enhanced = dict(zip(
+            unique,
+            executor.map(lambda prompt: enhance_prompt(api_key, prompt, client=client, **kwargs), unique.values())
+        ))
+
+    return [enhanced[normalize_prompt(prompt)] for prompt in prompts]
+
+# Shared by every PromptPrefetcher, so a server with many sessions runs a
+# fixed number of threads rather than a pool and timers per session
+PREFETCH_WORKERS = 4
+
+_prefetch_executor: Optional[ThreadPoolExecutor] = None
+_prefetch_lock = threading.Lock()
+
+
+def _get_prefetch_executor() -> ThreadPoolExecutor:
+    global _prefetch_executor
+    with _prefetch_lock:
+        if _prefetch_executor is None:
+            _prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prompt-prefetch")
+        return _prefetch_executor
+
+
+class _Delayed:
+    """A call scheduled by _Scheduler; cancel() stops it if it has not run yet."""
+
+    def __init__(self, func: Callable, args: tuple):
+        self.func: Optional[Callable] = func
+        self.args = args
+
+    def cancel(self) -> None:
+        self.func = None
+
+
+class _Scheduler:
+    """Runs delayed calls on one daemon thread, instead of a Timer thread per call."""
+
+    def __init__(self):
+        self._queue: List[Tuple[float, int, _Delayed]] = []
+        self._condition = threading.Condition()
+        self._order = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+
+    def call_later(self, delay: float, func: Callable, *args) -> _Delayed:
+        call = _Delayed(func, args)
+        with self._condition:
+            heapq.heappush(self._queue, (time.monotonic() + delay, next(self._order), call))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="prompt-prefetch-timer", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return call
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue or self._queue[0][0] > time.monotonic():
+                    self._condition.wait(self._queue[0][0] - time.monotonic() if self._queue else None)
+                call = heapq.heappop(self._queue)[2]
+            func = call.func
+            if func is None:
+                continue
+            try:
+                func(*call.args)
+            except Exception as e:
+                logger.exception("Delayed call failed: %s", str(e))
+
+
+_scheduler = _Scheduler()
+
+
+class PromptPrefetcher:
+    """
+    Enhances the prompt a user is typing in the background, before they ask for it.
+
+    Each submit() restarts a debounce timer; once the prompt has stopped
+    changing for delay seconds its enhancement starts on a worker thread.
+    Submitting a different prompt cancels the pending timer and any queued
+    enhancement of the old one, and results for stale prompts are dropped,
+    so at most one request per settled prompt is in flight. enhance()
+    returns the prefetched result, waiting for it if it is still running.
+
+    Prefetchers hold no threads of their own: debounce timers share one
+    scheduler thread and enhancements run on a shared worker pool (or the
+    given executor), so one per user session costs only its own state.
+
+    Args:
+        api_key: Bria AI API key
+        delay: Seconds a prompt must stay unchanged before it is enhanced
+        client: Optional BriaClient to send requests with (defaults to the shared client)
+        executor: Executor to run enhancements on (defaults to a pool shared by all prefetchers)
+        **kwargs: Additional parameters for the API
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        delay: float = 0.6,
+        client: Optional[BriaClient] = None,
+        executor: Optional[Executor] = None,
+        **kwargs
+    ):
+        self.api_key = api_key
+        self.delay = delay
+        self.client = client
+        self.kwargs = kwargs
+        self._executor = executor or _get_prefetch_executor()
+        self._lock = threading.Lock()
+        self._timer: Optional[_Delayed] = None
+        self._latest: Optional[str] = None
+        self._future: Optional[Future] = None
+
+    def submit(self, prompt: str) -> None:
+        """Note the current prompt text and (re)start the debounce timer for it."""
+        normalized = normalize_prompt(prompt)
+        with self._lock:
+            if normalized == self._latest:
+                return
+            self._latest = normalized
+            self._cancel_locked()
+            if not normalized or cached_enhancement(prompt, **self.kwargs)[1] is not None:
+                return
+            self._timer = _scheduler.call_later(self.delay, self._start, prompt, normalized)
+
+    def _start(self, prompt: str, normalized: str) -> None:
+        with self._lock:
+            if normalized == self._latest and self._timer is not None:
+                self._start_locked(prompt)
+
+    def _start_locked(self, prompt: str) -> None:
+        self._timer = None
+        self._future = self._executor.submit(
+            enhance_prompt, self.api_key, prompt, client=self.client, **self.kwargs
+        )
+
+    def _cancel_locked(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._future is not None:
+            # Only a queued enhancement can be cancelled; one already running
+            # finishes and fills the cache, but its result is no longer used
+            self._future.cancel()
+            self._future = None
+
+    def enhance(self, prompt: str, timeout: Optional[float] = None) -> str:
+        """
+        Return the enhancement of prompt, using the prefetched result when there is one.
+
+        Args:
+            prompt: Prompt to enhance
+            timeout: Seconds to wait for an in-flight prefetch before calling the API directly
+        """
+        normalized = normalize_prompt(prompt)
+        with self._lock:
+            if normalized == self._latest and self._timer is not None:
+                # Asked for before the debounce elapsed: start it now instead
+                self._timer.cancel()
+                self._start_locked(prompt)
+            future = self._future if normalized == self._latest else None
+        if future is not None and not future.cancelled():
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                pass
+        return enhance_prompt(self.api_key, prompt, client=self.client, **self.kwargs)
+
+    def ready(self, prompt: str) -> bool:
+        """Return whether the enhancement of prompt is available without waiting."""
+        normalized = normalize_prompt(prompt)
+        with self._lock:
+            future = self._future if normalized == self._latest else None
+        if future is not None and future.done() and not future.cancelled():
+            return True
+        return cached_enhancement(prompt, **self.kwargs)[1] is not None
+
+    def close(self) -> None:
+        """Cancel the pending prefetch; the shared threads keep serving other prefetchers."""
+        with self._lock:
+            self._latest = None
+            self._cancel_locked()
+
+__all__ = [
+    'PromptPrefetcher',
+    'enhance_prompt',
+    'enhance_prompts',
+    'request_prompt_enhancement',
+    'normalize_prompt',
+    'get_prompt_cache',
+    'set_prompt_cache',
+    'build_prompt_enhancement_request',
+]
@@ -0,0 +1,197 @@
+from typing import Dict, Optional, Tuple
+import hashlib
+import sqlite3
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Base class for client-side token-bucket rate limiters.
+
+    Every (API key, endpoint URL) pair has its own bucket that refills at
+    per_minute tokens per minute and holds up to burst tokens. Each request
+    reserves one token; when the bucket is empty the caller waits locally
+    until its token is due instead of being throttled by the API. Because
+    tokens are reserved under a lock before waiting, threads and asyncio
+    tasks sharing a limiter queue up in order.
+
+    Subclasses implement _reserve and _penalize on stored bucket state, and
+    set blocking when those wait on disk or file locks; acquire_async then
+    reserves from a worker thread so the event loop keeps running.
+
+    Args:
+        per_minute: Default requests per minute per key and endpoint
+        burst: Requests allowed back to back after an idle period (defaults to per_minute)
+        limits: Per-endpoint per_minute overrides keyed by endpoint path prefix
+    """
+
+    blocking = False
+
+    def __init__(
+        self,
+        per_minute: float = 60,
+        burst: Optional[float] = None,
+        limits: Optional[Dict[str, float]] = None
+    ):
+        self.per_minute = per_minute
+        self.burst = burst
+        self.limits = dict(limits or {})
+
+    def limit_for(self, endpoint: str) -> Tuple[float, float]:
+        """Return the (tokens per second, bucket size) for an endpoint, using the longest matching prefix."""
+        endpoint = endpoint.lstrip("/")
+        matches = [prefix for prefix in self.limits if endpoint.startswith(prefix)]
+        per_minute = self.limits[max(matches, key=len)] if matches else self.per_minute
+        burst = self.burst if self.burst is not None else per_minute
+        return per_minute / 60.0, max(1.0, burst)
+
+    @staticmethod
+    def bucket_key(api_key: str, url: str) -> str:
+        # Keys are hashed so persistent backends never store the API key itself
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16] + " " + url
+
+    def reserve(self, api_key: str, endpoint: str, url: Optional[str] = None) -> float:
+        """
+        Take one token and return the seconds to wait before sending.
+
+        Args:
+            api_key: Bria AI API key
+            endpoint: Endpoint path, used to pick the limit
+            url: Full endpoint URL the bucket is keyed on (defaults to endpoint)
+        """
+        rate, burst = self.limit_for(endpoint)
+        return self._reserve(self.bucket_key(api_key, url or endpoint), rate, burst)
+
+    def acquire(self, api_key: str, endpoint: str, url: Optional[str] = None) -> float:
+        """Block until a request may be sent; returns the seconds waited."""
+        delay = self.reserve(api_key, endpoint, url)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self, api_key: str, endpoint: str, url: Optional[str] = None) -> float:
+        """Wait without blocking the event loop until a request may be sent."""
+        # Imported here so sync-only processes do not load asyncio
+        import asyncio
+
+        if self.blocking:
+            delay = await asyncio.to_thread(self.reserve, api_key, endpoint, url)
+        else:
+            delay = self.reserve(api_key, endpoint, url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def penalize(self, api_key: str, endpoint: str, seconds: float, url: Optional[str] = None) -> None:
+        """
+        Hold back every caller of a bucket for seconds, e.g. after a 429 with Retry-After.
+
+        Args:
+            api_key: Bria AI API key
+            endpoint: Endpoint path, used to pick the limit
+            seconds: How long the API asked us to pause
+            url: Full endpoint URL the bucket is keyed on (defaults to endpoint)
+        """
+        rate, burst = self.limit_for(endpoint)
+        self._penalize(self.bucket_key(api_key, url or endpoint), rate, burst, seconds)
+
+    @staticmethod
+    def _refill(tokens: float, updated: float, now: float, rate: float, burst: float) -> float:
+        return min(burst, tokens + max(0.0, now - updated) * rate)
+
+    def _reserve(self, key: str, rate: float, burst: float) -> float:
+        raise NotImplementedError
+
+    def _penalize(self, key: str, rate: float, burst: float, seconds: float) -> None:
+        raise NotImplementedError
+
+
+class MemoryRateLimiter(RateLimiter):
+    """Rate limiter shared by the threads and event loops of one process."""
+
+    def __init__(self, per_minute: float = 60, burst: Optional[float] = None, limits: Optional[Dict[str, float]] = None):
+        super().__init__(per_minute=per_minute, burst=burst, limits=limits)
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def _reserve(self, key: str, rate: float, burst: float) -> float:
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(key, (burst, now))
+            # Tokens may go negative: that is the queue of callers already waiting
+            tokens = self._refill(tokens, updated, now, rate, burst) - 1
+            self._buckets[key] = (tokens, now)
+            return -tokens / rate if tokens < 0 else 0.0
+
+    def _penalize(self, key: str, rate: float, burst: float, seconds: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(self._refill(tokens, updated, now, rate, burst), -seconds * rate)
+            self._buckets[key] = (tokens, now)
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """
+    Rate limiter whose buckets live in a SQLite database, shared across processes.
+
+    Args:
+        path: Database file path
+        per_minute: Default requests per minute per key and endpoint
+        burst: Requests allowed back to back after an idle period (defaults to per_minute)
+        limits: Per-endpoint per_minute overrides keyed by endpoint path prefix
+    """
+
+    blocking = True  # Transactions wait up to 30 s for other processes
+
+    def __init__(
+        self,
+        path: str = "bria_ratelimit.sqlite",
+        per_minute: float = 60,
+        burst: Optional[float] = None,
+        limits: Optional[Dict[str, float]] = None
+    ):
+        super().__init__(per_minute=per_minute, burst=burst, limits=limits)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def _update(self, key: str, burst: float, update) -> float:
+        # BEGIN IMMEDIATE takes the write lock up front so concurrent
+        # processes read and update a bucket one at a time
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens, updated = row if row is not None else (burst, now)
+                tokens, result = update(tokens, updated, now)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)", (key, tokens, now)
+                )
+                self._conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _reserve(self, key: str, rate: float, burst: float) -> float:
+        def update(tokens, updated, now):
+            tokens = self._refill(tokens, updated, now, rate, burst) - 1
+            return tokens, (-tokens / rate if tokens < 0 else 0.0)
+        return self._update(key, burst, update)
+
+    def _penalize(self, key: str, rate: float, burst: float, seconds: float) -> None:
+        def update(tokens, updated, now):
+            return min(self._refill(tokens, updated, now, rate, burst), -seconds * rate), None
+        self._update(key, burst, update)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+__all__ = ['RateLimiter', 'MemoryRateLimiter', 'SQLiteRateLimiter']
@@ -0,0 +1,81 @@
+from typing import Any, List, Mapping, Optional
+
+# Fields that identify an asynchronous request, at the top level or per result
+JOB_ID_FIELDS = ("request_id", "job_id")
+
+
+class BriaResult(dict):
+    """
+    Response of a Bria image service, parsed once into typed fields.
+
+    The API answers in several shapes: {"result_url": url}, {"result_urls": [...]},
+    {"urls": [...]} and {"result": [...]} where each entry is a URL, a
+    {"urls": [...], "seed": ...} dict or a [url, seed, ...] list. BriaResult
+    normalizes all of them when it is created. It is still the response dict
+    itself, so existing code that indexes it or serializes it keeps working;
+    the parsed fields are not updated if the dict is modified afterwards.
+
+    Attributes:
+        urls: Result image URLs, in the order the API returned them
+        seeds: Seeds of the results that reported one
+        status: The response's status field, if any
+        job_ids: Request or job ids of an asynchronous request
+    """
+
+    __slots__ = ("urls", "seeds", "status", "job_ids")
+
+    def __init__(self, response: Optional[Mapping[str, Any]] = None):
+        super().__init__(response or {})
+        self.urls: List[str] = []
+        self.seeds: List[int] = []
+        self.job_ids: List[str] = []
+        self.status: Optional[str] = self.get("status")
+        self._parse()
+
+    def _parse(self) -> None:
+        for field in JOB_ID_FIELDS:
+            if self.get(field) is not None:
+                self.job_ids.append(str(self[field]))
+        if self.get("seed") is not None:
+            self.seeds.append(self["seed"])
+        self.seeds.extend(seed for seed in self.get("seeds") or [] if seed is not None)
+
+        if self.get("result_url"):
+            self.urls.append(self["result_url"])
+            return
+        for field in ("result_urls", "urls"):
+            if self.get(field):
+                self.urls.extend(url for url in self[field] if isinstance(url, str))
+                return
+
+        for item in self.get("result") or []:
+            if isinstance(item, str):
+                self.urls.append(item)
+            elif isinstance(item, Mapping):
+                self.urls.extend(url for url in item.get("urls") or [] if isinstance(url, str))
+                if item.get("seed") is not None:
+                    self.seeds.append(item["seed"])
+                self.job_ids.extend(str(item[field]) for field in JOB_ID_FIELDS if item.get(field) is not None)
+            elif isinstance(item, (list, tuple)) and item and isinstance(item[0], str):
+                self.urls.append(item[0])
+                if len(item) > 1 and isinstance(item[1], int):
+                    self.seeds.append(item[1])
+
+    @property
+    def url(self) -> Optional[str]:
+        """The first result URL, or None if the response has none."""
+        return self.urls[0] if self.urls else None
+
+    def __repr__(self) -> str:
+        return f"BriaResult(urls={self.urls!r}, seeds={self.seeds!r}, status={self.status!r}, job_ids={self.job_ids!r})"
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+
+def to_result(response: Mapping[str, Any]) -> BriaResult:
+    """Return response as a BriaResult, parsing it only if it is not one already."""
+    return response if isinstance(response, BriaResult) else BriaResult(response)
+
+
+__all__ = ['BriaResult', 'to_result']
@@ -0,0 +1,129 @@
+from typing import Optional, Tuple, Type
+import random
+import threading
+import time
+from .errors import BriaError, CircuitOpenError, RateLimitedError, TransientError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class RetryPolicy:
+    """
+    Decides whether a failed call is retried and how long to wait first.
+
+    Waits grow exponentially with full jitter, so workers that failed together
+    do not retry in lockstep. A Retry-After sent by the server is honored
+    instead; if it asks for longer than max_delay the error is raised rather
+    than holding a worker that long.
+
+    Args:
+        max_attempts: Total attempts per call, including the first (1 disables retries)
+        base_delay: Upper bound of the first jittered wait in seconds
+        max_delay: Longest single wait in seconds
+        retry_on: Error classes that are retried
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        retry_on: Tuple[Type[BriaError], ...] = (RateLimitedError, TransientError)
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+
+    def delay_for(self, error: BriaError, attempt: int) -> Optional[float]:
+        """
+        Return the seconds to wait before the next attempt, or None to give up.
+
+        Args:
+            error: Error raised by the attempt
+            attempt: Number of the attempt that failed, starting at 1
+        """
+        if attempt >= self.max_attempts or not isinstance(error, self.retry_on):
+            return None
+        if error.retry_after is not None:
+            return error.retry_after if error.retry_after <= self.max_delay else None
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast while an endpoint keeps failing.
+
+    After failure_threshold consecutive transient failures the circuit opens
+    and calls raise CircuitOpenError without touching the network. Once
+    reset_timeout seconds have passed, one trial call is let through: success
+    closes the circuit, another failure opens it again. A trial that ends
+    neither way (cancelled, interrupted or a non-API error) hands its slot
+    back through release_trial(), and a trial that has not reported back
+    within reset_timeout is replaced by the next call.
+
+    Args:
+        failure_threshold: Consecutive transient failures that open the circuit
+        reset_timeout: Seconds the circuit stays open before a trial call
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_started = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self, name: str = "endpoint") -> None:
+        """Raise CircuitOpenError unless a call may be attempted now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            now = time.monotonic()
+            if self.state == OPEN:
+                remaining = self._opened_at + self.reset_timeout - now
+            else:
+                # A trial is in flight; replace it if it never reported back
+                remaining = self._trial_started + self.reset_timeout - now
+            if remaining <= 0:
+                # Let this call through as the trial; others keep failing fast
+                self.state = HALF_OPEN
+                self._trial_started = now
+                return
+            raise CircuitOpenError(
+                f"Circuit open for {name} after {self.failures} consecutive failures",
+                retry_after=max(0.0, remaining)
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+
+    def release_trial(self) -> None:
+        """Give back the trial slot of a call that neither succeeded nor failed, so the next call can try."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.state = OPEN
+                self._opened_at = time.monotonic() - self.reset_timeout
+
+    def record_failure(self, error: BriaError) -> None:
+        """Count a failed call; only transient failures say the endpoint is unhealthy."""
+        with self._lock:
+            if not isinstance(error, TransientError):
+                if self.state == HALF_OPEN:
+                    # The trial reached the server, so the endpoint is up
+                    self.state = CLOSED
+                    self.failures = 0
+                return
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+
+
+__all__ = ['RetryPolicy', 'CircuitBreaker', 'CLOSED', 'OPEN', 'HALF_OPEN']
@@ -1,10 +1,11 @@
-from typing import Dict, Any, List, Optional
-import requests
-import base64
+from typing import Dict, Any, List, Optional, Tuple
+from .client import BriaClient, get_client
+from .errors import service_error
+from .results import BriaResult
+from .upload import ImageInput, image_fields
 
-def add_shadow(
-    api_key: str,
-    image_data: bytes = None,
+def build_shadow_request(
+    image_data: ImageInput = None,
     image_url: str = None,
     shadow_type: str = "regular",
     background_color: Optional[str] = None,
@@ -17,37 +18,8 @@ def add_shadow(
     sku: Optional[str] = None,
     force_rmbg: bool = False,
     content_moderation: bool = False
-) -> Dict[str, Any]:
-    """
-    Add shadow to an image.
-    
-    Args:
-        api_key: Bria AI API key
-        image_data: Image data in bytes (optional if image_url provided)
-        image_url: URL of the image (optional if image_data provided)
-        shadow_type: Type of shadow ("regular" or "float")
-        background_color: Optional background color in hex format
-        shadow_color: Shadow color in hex format
-        shadow_offset: [x, y] offset for shadow
-        shadow_intensity: Shadow intensity (0-100)
-        shadow_blur: Shadow blur amount
-        shadow_width: Optional shadow width for float shadows
-        shadow_height: Optional shadow height for float shadows
-        sku: Optional SKU identifier
-        force_rmbg: Whether to force background removal
-        content_moderation: Whether to enable content moderation
-    
-    Returns:
-        Dict containing the API response
-    """
-    url = "https://engine.prod.bria-api.com/v1/product/shadow"
-    
-    headers = {
-        'api_token': api_key,
-        'Accept': 'application/json',
-        'Content-Type': 'application/json'
-    }
-    
+) -> Tuple[str, Dict[str, Any]]:
+    """Build the endpoint and payload for a shadow request."""
     # Prepare request data
     data = {
         'shadow_type': shadow_type,
@@ -60,9 +32,9 @@ def add_shadow(
     
     # Add image data
     if image_url:
-        data['image_url'] = image_url
+        data['image_url'] = image_url  # Forwarded as given, whatever its scheme
     elif image_data:
-        data['file'] = base64.b64encode(image_data).decode('utf-8')
+        data.update(image_fields(image_data, "product/shadow"))
     else:
         raise ValueError("Either image_data or image_url must be provided")
     
@@ -78,17 +50,65 @@ def add_shadow(
     if sku:
         data['sku'] = sku
     
+    return "product/shadow", data
+
+def add_shadow(
+    api_key: str,
+    image_data: ImageInput = None,
+    image_url: str = None,
+    shadow_type: str = "regular",
+    background_color: Optional[str] = None,
+    shadow_color: str = "#000000",
+    shadow_offset: List[int] = [0, 15],
+    shadow_intensity: int = 60,
+    shadow_blur: Optional[int] = None,
+    shadow_width: Optional[int] = None,
+    shadow_height: Optional[int] = 70,
+    sku: Optional[str] = None,
+    force_rmbg: bool = False,
+    content_moderation: bool = False,
+    client: Optional[BriaClient] = None
+) -> BriaResult:
+    """
+    Add shadow to an image.
+    
+    Args:
+        api_key: Bria AI API key
+        image_data: Image bytes, file path or URL (optional if image_url provided)
+        image_url: URL of the image (optional if image_data provided)
+        shadow_type: Type of shadow ("regular" or "float")
+        background_color: Optional background color in hex format
+        shadow_color: Shadow color in hex format
+        shadow_offset: [x, y] offset for shadow
+        shadow_intensity: Shadow intensity (0-100)
+        shadow_blur: Shadow blur amount
+        shadow_width: Optional shadow width for float shadows
+        shadow_height: Optional shadow height for float shadows
+        sku: Optional SKU identifier
+        force_rmbg: Whether to force background removal
+        content_moderation: Whether to enable content moderation
+        client: Optional BriaClient to send the request with (defaults to the shared client)
+    
+    Returns:
+        BriaResult with the result URLs (also the API response dict)
+    """
+    endpoint, data = build_shadow_request(
+        image_data=image_data,
+        image_url=image_url,
+        shadow_type=shadow_type,
+        background_color=background_color,
+        shadow_color=shadow_color,
+        shadow_offset=shadow_offset,
+        shadow_intensity=shadow_intensity,
+        shadow_blur=shadow_blur,
+        shadow_width=shadow_width,
+        shadow_height=shadow_height,
+        sku=sku,
+        force_rmbg=force_rmbg,
+        content_moderation=content_moderation
+    )
+    
     try:
-        print(f"Making request to: {url}")
-        print(f"Headers: {headers}")
-        print(f"Data: {data}")
-        
-        response = requests.post(url, headers=headers, json=data)
-        response.raise_for_status()
-        
-        print(f"Response status: {response.status_code}")
-        print(f"Response body: {response.text}")
-        
-        return response.json()
+        return BriaResult((client or get_client()).post(endpoint, api_key, data))
     except Exception as e:
-        raise Exception(f"Shadow addition failed: {str(e)}") 
\ No newline at end of file
+        raise service_error("Shadow addition failed", e)
\ No newline at end of file
@@ -0,0 +1,63 @@
+import io
+import numpy as np
+import pytest
+from PIL import Image
+from services.masks import bounding_box, dilate, feather, mask_from_canvas, rescale
+
+
+def full_rescale(mask: np.ndarray, size):
+    # Reference: interpolate every output pixel at full resolution
+    values = mask.astype(np.float32)
+    width, height = size
+
+    def coordinates(out: int, src: int):
+        position = np.clip((np.arange(out, dtype=np.float32) + 0.5) * (src / out) - 0.5, 0, src - 1)
+        low = np.floor(position).astype(np.intp)
+        return low, np.minimum(low + 1, src - 1), position - low
+
+    y0, y1, wy = coordinates(height, values.shape[0])
+    x0, x1, wx = coordinates(width, values.shape[1])
+    rows = values[y0] * (1 - wy)[:, None] + values[y1] * wy[:, None]
+    return rows[:, x0] * (1 - wx) + rows[:, x1] * wx
+
+
+def canvas(width: int = 40, height: int = 30) -> np.ndarray:
+    strokes = np.zeros((height, width, 4), dtype=np.uint8)
+    strokes[8:14, 10:25, 3] = 255
+    strokes[20, 30, 3] = 255
+    return strokes
+
+
+SIZES = [(40, 30), (97, 61), (400, 300), (13, 9), (7, 5)]
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_rescale_matches_full_resolution(size):
+    mask = canvas()[..., 3] > 0
+    soft = feather(mask, 2)
+    assert np.array_equal(rescale(mask, size), full_rescale(mask, size).astype(np.float32))
+    assert np.array_equal(rescale(soft, size), full_rescale(soft, size).astype(np.float32))
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("soft", [False, True])
+def test_mask_from_canvas_matches_full_resolution(size, soft):
+    radius = 2 if soft else 0
+    values = dilate(canvas()[..., 3] >= 128, 1)
+    values = feather(values, radius) if radius else values
+    scaled = full_rescale(values, size)
+    expected = np.round(np.clip(scaled, 0, 1) * 255).astype(np.uint8) if soft else scaled >= 0.5
+
+    mask = mask_from_canvas(canvas(), size, grow=1, feather_radius=radius, soft=soft)
+
+    decoded = np.asarray(Image.open(io.BytesIO(mask.data)).convert('L'))
+    assert np.array_equal(decoded, expected if soft else expected * np.uint8(255))
+    assert mask.bbox == bounding_box(expected)
+    assert mask.coverage == pytest.approx(np.count_nonzero(expected) / expected.size)
+
+
+def test_empty_canvas():
+    mask = mask_from_canvas(np.zeros((30, 40, 4), dtype=np.uint8), (400, 300))
+    assert mask.bbox is None
+    assert mask.coverage == 0.0
+    assert not rescale(np.zeros((30, 40), dtype=bool), (400, 300)).any()
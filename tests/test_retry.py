@@ -0,0 +1,89 @@
+import asyncio
+import time
+import pytest
+from services import BriaClient, CircuitOpenError
+from services.aio import AsyncBriaClient
+from services.benchmarks.mock_server import MockBriaServer
+from services.retry import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def open_breaker(breaker: CircuitBreaker) -> None:
+    # Opened long enough ago that the next call is let through as the trial
+    breaker.state = OPEN
+    breaker.failures = breaker.failure_threshold
+    breaker._opened_at = time.monotonic() - breaker.reset_timeout - 1
+
+
+@pytest.fixture
+def server():
+    with MockBriaServer() as server:
+        yield server
+
+
+def test_released_trial_lets_the_next_call_try():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    open_breaker(breaker)
+    breaker.before_call("product/packshot")
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("product/packshot")
+
+    breaker.release_trial()
+    assert breaker.state == OPEN
+    breaker.before_call("product/packshot")
+    assert breaker.state == HALF_OPEN
+
+
+def test_stale_trial_is_replaced_after_reset_timeout():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    open_breaker(breaker)
+    breaker.before_call("product/packshot")
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("product/packshot")
+    time.sleep(0.06)
+    breaker.before_call("product/packshot")
+    assert breaker.state == HALF_OPEN
+
+
+def test_cancelled_async_trial_recovers(server):
+    async def scenario():
+        client = AsyncBriaClient(base_url=server.base_url)
+        breaker = client.breaker_for("product/packshot")
+        open_breaker(breaker)
+
+        server.latency = 5.0
+        trial = asyncio.ensure_future(client.post("product/packshot", "key", {"image_url": "http://x/a.png"}))
+        await asyncio.sleep(0.2)
+        assert breaker.state == HALF_OPEN
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        assert breaker.state != HALF_OPEN
+
+        server.latency = 0.0
+        result = await client.post("product/packshot", "key", {"image_url": "http://x/a.png"})
+        await client.close()
+        return result, breaker.state
+
+    result, state = asyncio.run(scenario())
+    assert "result_url" in result
+    assert state == CLOSED
+
+
+def test_non_api_error_in_sync_trial_recovers(server, monkeypatch):
+    client = BriaClient(base_url=server.base_url)
+    breaker = client.breaker_for("product/packshot")
+    open_breaker(breaker)
+
+    def broken_send(*args, **kwargs):
+        raise RuntimeError("bug while sending")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(client, "_send", broken_send)
+        with pytest.raises(RuntimeError):
+            client.post("product/packshot", "key", {"image_url": "http://x/a.png"})
+    assert breaker.state != HALF_OPEN
+
+    assert "result_url" in client.post("product/packshot", "key", {"image_url": "http://x/a.png"})
+    assert breaker.state == CLOSED
+    client.close()
@@ -0,0 +1,214 @@
+from typing import Any, Dict, Optional, Tuple, NamedTuple, Union
+import io
+import os
+import threading
+
+# Largest side the image endpoints work at; bigger uploads are downscaled by
+# the API anyway, so sending more pixels only costs upload time
+DEFAULT_MAX_SIDE = 2048
+
+# Image arguments accepted by the service functions: encoded bytes, a local
+# file path, or an http(s) URL that the API fetches itself
+ImageInput = Union[bytes, str, os.PathLike]
+
+
+class PreparedImage(NamedTuple):
+    """Result of preparing one image for upload."""
+    data: bytes
+    original_bytes: int
+    size: Tuple[int, int]
+    format: str
+    resized: bool
+
+    @property
+    def prepared_bytes(self) -> int:
+        return len(self.data)
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - self.prepared_bytes
+
+
+class UploadPreparer:
+    """
+    Shrinks and re-encodes images before they are base64-encoded for upload.
+
+    Images are rotated according to their EXIF orientation, downscaled so
+    their longest side fits the endpoint's working resolution and re-encoded
+    without metadata: JPEG for opaque images, PNG when there is transparency.
+    If re-encoding an untouched image would make it bigger, the original bytes
+    are sent. Totals are kept in stats() so savings can be reported.
+
+    Args:
+        max_side: Longest side per endpoint path, for endpoints that differ from DEFAULT_MAX_SIDE
+        jpeg_quality: JPEG quality used for opaque images
+    """
+
+    def __init__(self, max_side: Optional[Dict[str, int]] = None, jpeg_quality: int = 90):
+        self.max_side = dict(max_side or {})
+        self.jpeg_quality = jpeg_quality
+        self._lock = threading.Lock()
+        self._stats = {"images": 0, "original_bytes": 0, "prepared_bytes": 0}
+
+    def max_side_for(self, endpoint: str) -> int:
+        return self.max_side.get(endpoint.lstrip("/"), DEFAULT_MAX_SIDE)
+
+    def prepare(
+        self,
+        image_data: bytes,
+        endpoint: str,
+        target_size: Optional[Tuple[int, int]] = None,
+        is_mask: bool = False
+    ) -> PreparedImage:
+        """
+        Prepare one image for upload to endpoint.
+
+        Args:
+            image_data: Original encoded image bytes
+            endpoint: Endpoint the image is sent to
+            target_size: Exact output size, e.g. to keep a mask aligned with its image
+            is_mask: Resize with nearest-neighbour and always encode as PNG
+        """
+        # Imported here so importing the services does not load Pillow
+        from PIL import Image, ImageOps
+
+        try:
+            original = Image.open(io.BytesIO(image_data))
+            had_metadata = "exif" in original.info or len(original.getexif()) > 0
+            img = ImageOps.exif_transpose(original)
+        except Exception:
+            # Not something Pillow can read; send it untouched
+            return self._record(PreparedImage(image_data, len(image_data), (0, 0), "", False))
+
+        if target_size is None:
+            limit = self.max_side_for(endpoint)
+            if max(img.size) > limit:
+                factor = limit / max(img.size)
+                target_size = (max(1, round(img.width * factor)), max(1, round(img.height * factor)))
+
+        resized = target_size is not None and target_size != img.size
+        if resized:
+            img = img.resize(target_size, Image.NEAREST if is_mask else Image.LANCZOS)
+
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        buffer = io.BytesIO()
+        if is_mask or has_alpha:
+            image_format = "PNG"
+            if not is_mask and img.mode not in ("RGBA", "LA"):
+                img = img.convert("RGBA")
+            img.save(buffer, format="PNG", optimize=True)
+        else:
+            image_format = "JPEG"
+            if img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            img.save(buffer, format="JPEG", quality=self.jpeg_quality, optimize=True)
+        data = buffer.getvalue()
+
+        if not resized and not had_metadata and len(data) >= len(image_data):
+            data, image_format = image_data, original.format or ""
+
+        return self._record(PreparedImage(data, len(image_data), img.size, image_format, resized))
+
+    def _record(self, prepared: PreparedImage) -> PreparedImage:
+        with self._lock:
+            self._stats["images"] += 1
+            self._stats["original_bytes"] += prepared.original_bytes
+            self._stats["prepared_bytes"] += prepared.prepared_bytes
+        return prepared
+
+    def stats(self) -> Dict[str, int]:
+        """Totals over every prepared image, including 'saved_bytes'."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["saved_bytes"] = stats["original_bytes"] - stats["prepared_bytes"]
+        return stats
+
+
+_default_preparer: Optional[UploadPreparer] = UploadPreparer()
+
+
+def get_upload_preparer() -> Optional[UploadPreparer]:
+    """Return the preparer used by the service functions, or None if disabled."""
+    return _default_preparer
+
+
+def set_upload_preparer(preparer: Optional[UploadPreparer]) -> None:
+    """Replace the shared preparer; pass None to upload images exactly as given."""
+    global _default_preparer
+    _default_preparer = preparer
+
+
+def prepare_upload(image_data: bytes, endpoint: str, **kwargs) -> bytes:
+    """Prepare image bytes with the shared preparer, if one is set."""
+    preparer = get_upload_preparer()
+    if preparer is None:
+        return image_data
+    return preparer.prepare(image_data, endpoint, **kwargs).data
+
+
+def prepare_image_and_mask(image_data: bytes, mask_data: bytes, endpoint: str) -> Tuple[bytes, bytes]:
+    """Prepare an image and resize its mask to the same dimensions."""
+    preparer = get_upload_preparer()
+    if preparer is None:
+        return image_data, mask_data
+    image = preparer.prepare(image_data, endpoint)
+    if not image.resized:
+        return image.data, mask_data
+    mask = preparer.prepare(mask_data, endpoint, target_size=image.size, is_mask=True)
+    return image.data, mask.data
+
+
+def is_url(image: Any) -> bool:
+    """Return whether an image argument is a remote URL rather than bytes or a path."""
+    return isinstance(image, str) and image.lower().startswith(("http://", "https://"))
+
+
+def read_image(image: ImageInput) -> bytes:
+    """Return the bytes of an image given as bytes or a local file path."""
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return image
+    with open(image, "rb") as f:
+        return f.read()
+
+
+def image_fields(
+    image: ImageInput,
+    endpoint: str,
+    file_field: str = "file",
+    url_field: str = "image_url",
+    prepare: bool = True
+) -> Dict[str, Any]:
+    """
+    Build the payload field for one image argument.
+
+    URLs are forwarded as url_field so the API downloads them directly and
+    results can be chained between calls without passing through this process.
+    Bytes and paths are read, prepared for upload and sent as file_field.
+
+    Args:
+        image: Image bytes, local file path or http(s) URL
+        endpoint: Endpoint the image is sent to
+        file_field: Payload field for uploaded image bytes
+        url_field: Payload field for image URLs
+        prepare: Whether to shrink and re-encode uploaded bytes
+    """
+    if is_url(image):
+        return {url_field: image}
+    image_data = read_image(image)
+    if prepare:
+        image_data = prepare_upload(image_data, endpoint)
+    return {file_field: image_data}
+
+
+__all__ = [
+    'ImageInput',
+    'PreparedImage',
+    'UploadPreparer',
+    'get_upload_preparer',
+    'set_upload_preparer',
+    'prepare_upload',
+    'prepare_image_and_mask',
+    'is_url',
+    'read_image',
+    'image_fields',
+]